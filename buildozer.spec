@@ -16,7 +16,7 @@ source.include_exts = py,png,jpg,kv,json
 version = 0.1
 
 # Anforderungen / Dependencies
-requirements = python3,kivy,requests,python-dotenv,cython
+requirements = python3,kivy,requests,python-dotenv,cython,sqlite3,websocket-client
 
 # Orientierung
 orientation = portrait
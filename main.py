@@ -8,56 +8,1019 @@ from kivy.uix.checkbox import CheckBox
 from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.clock import Clock
+from kivy.core.window import Window
 from kivy.graphics import Color, Rectangle
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.spinner import Spinner
 from kivy.utils import get_color_from_hex
 
 import requests
+import csv
 import json
 import os
 import re
-from datetime import datetime, date
-from dotenv import load_dotenv, set_key
+import sys
+import sqlite3
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, date, timedelta
+from dotenv import dotenv_values
 from pathlib import Path
 
-# --- Globale Session ---
-session = requests.Session()
-
 # Shortlink (hardcoded)
 SHORTLINK = os.getenv("SHORTLINK")
 
 if SHORTLINK is None:
     raise ValueError("Kein SHORTLINK gesetzt! Bitte SHORTLINK prüfen.")
 
+# ---------------------------------------------------
+# 🔹 Performance-Messung
+# ---------------------------------------------------
+PERF_BUFFER_SIZE = 500
+
+
+class PerfMonitor:
+    """
+    Ringpuffer der letzten Messungen: API-Aufrufe, Screen-Ladezeiten und
+    Widget-Aufbau. Ein Sample ist ein Dict {"t", "kind", "name", "ms", ...};
+    record() ist threadsicher und liefert das Sample zum Ergänzen zurück.
+    """
+    def __init__(self, size=PERF_BUFFER_SIZE):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, kind, name, duration, **fields):
+        sample = {"t": round(time.time(), 3), "kind": kind, "name": name,
+                  "ms": round(duration * 1000, 1), **fields}
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    @contextmanager
+    def measure(self, kind, name, **fields):
+        """with perf.measure("widgets", "…") as fields: – fields kann im Block ergänzt werden."""
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(kind, name, time.perf_counter() - start, **fields)
+
+    def begin(self, kind, name):
+        """Für Messungen über mehrere Callbacks (z.B. Screen laden bis alles angezeigt ist)."""
+        return kind, name, time.perf_counter()
+
+    def end(self, token, **fields):
+        if token is not None:
+            kind, name, start = token
+            self.record(kind, name, time.perf_counter() - start, **fields)
+
+    def recent(self, kind=None, n=20):
+        with self._lock:
+            samples = list(self.samples)
+        return [s for s in samples if kind is None or s["kind"] == kind][-n:]
+
+    def summary(self):
+        """Je (kind, name): Anzahl, Mittel und Maximum in ms, langsamste zuerst."""
+        groups = {}
+        for s in self.recent(n=len(self.samples)):
+            groups.setdefault((s["kind"], s["name"]), []).append(s["ms"])
+        rows = [{"kind": k, "name": n, "count": len(ms), "avg_ms": round(sum(ms) / len(ms), 1),
+                 "max_ms": max(ms)} for (k, n), ms in groups.items()]
+        return sorted(rows, key=lambda r: -r["avg_ms"] * r["count"])
+
+    def export(self, path=None):
+        """Schreibt Samples und Zusammenfassung als JSON (Standard: perf_log.json im user_data_dir)."""
+        path = Path(path or Path(App.get_running_app().user_data_dir) / "perf_log.json")
+        data = {"exported_at": datetime.now().isoformat(timespec="seconds"),
+                "summary": self.summary(), "samples": self.recent(n=len(self.samples))}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+        print(f"[INFO] Performance-Log exportiert: {path}")
+        return path
+
+
+perf = PerfMonitor()
+
+
+# ---------------------------------------------------
+# 🔹 Hintergrund-Requests (hält den Kivy-Mainthread frei)
+# ---------------------------------------------------
+class RequestDispatcher:
+    """
+    Führt blockierende Aufrufe in einem Thread-Pool aus und liefert
+    Ergebnis oder Fehler per Clock.schedule_once zurück in den Mainthread.
+    Aufträge gehören einem Owner (meist dem Screen); cancel(owner) verwirft
+    alle noch offenen Aufträge und deren Ergebnisse.
+    owner=None bedeutet: nicht abbrechbar (z.B. Schreibzugriffe).
+    """
+    def __init__(self, max_workers=4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="baserow")
+        self._lock = threading.Lock()
+        self._generations = {}  # id(owner) -> Zähler, erhöht bei cancel()
+        self._futures = {}      # id(owner) -> offene Futures
+
+    def submit(self, owner, func, *args, on_success=None, on_error=None, **kwargs):
+        key = id(owner) if owner is not None else None
+        return self._submit(key, self._generation(key), func, args, kwargs, on_success, on_error)
+
+    def submit_stream(self, owner, gen_func, *args, on_item=None, on_done=None, on_error=None, **kwargs):
+        """
+        Wie submit(), aber für Generatoren: jedes Element (z.B. eine Seite Zeilen)
+        wird sofort einzeln an on_item geliefert, on_done erhält die Anzahl.
+        """
+        key = id(owner) if owner is not None else None
+        generation = self._generation(key)
+
+        def run():
+            count = 0
+            for item in gen_func(*args, **kwargs):
+                if not self._is_current(key, generation):
+                    break  # Owner hat abgebrochen -> restliche Seiten nicht mehr laden
+                if on_item is not None:
+                    Clock.schedule_once(
+                        lambda dt, item=item: self._deliver(key, generation, on_item, item), 0)
+                count += 1
+            return count
+
+        return self._submit(key, generation, run, (), {}, on_done, on_error)
+
+    def _generation(self, key):
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def _submit(self, key, generation, func, args, kwargs, on_success, on_error):
+        with self._lock:
+            future = self._executor.submit(func, *args, **kwargs)
+            if key is not None:
+                self._futures.setdefault(key, set()).add(future)
+        future.add_done_callback(
+            lambda f: self._on_done(key, generation, f, on_success, on_error))
+        return future
+
+    def cancel(self, owner):
+        """Verwirft alle offenen Aufträge eines Owners (z.B. beim Verlassen des Screens)."""
+        key = id(owner)
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            futures = self._futures.pop(key, set())
+        for f in futures:
+            f.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _is_current(self, key, generation):
+        if key is None:
+            return True
+        with self._lock:
+            return self._generations.get(key, 0) == generation
+
+    def _on_done(self, key, generation, future, on_success, on_error):
+        if key is not None:
+            with self._lock:
+                self._futures.get(key, set()).discard(future)
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            callback, value = on_error, exc
+            if callback is None:
+                print("[ERROR] Hintergrund-Request:", exc)
+        else:
+            callback, value = on_success, future.result()
+        if callback is None:
+            return
+        Clock.schedule_once(lambda dt: self._deliver(key, generation, callback, value), 0)
+
+    def _deliver(self, key, generation, callback, value):
+        # Ergebnis verwerfen, wenn der Owner inzwischen abgebrochen hat
+        if self._is_current(key, generation):
+            callback(value)
+
+
+dispatcher = RequestDispatcher()
+
+
+class BaserowAPIError(Exception):
+    """Antwort der Baserow-API mit unerwartetem Statuscode."""
+    def __init__(self, status_code, text=""):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.text = text
+
+
+# Baserow liefert standardmäßig nur 100 Zeilen pro Seite, maximal 200
+ROWS_PAGE_SIZE = 200
+# Maximale Anzahl Zeilen pro Aufruf des batch/-Endpunkts
+BATCH_SIZE = 200
+
+
+class RowQuery:
+    """
+    Kleiner Query-Builder für database/rows/table/<id>/:
+    RowQuery().filter("Datum", "date_equal", "2024-05-07").order_by("-Datum").size(1)
+    """
+    def __init__(self):
+        self._params = {}
+
+    def filter(self, field, op, value):
+        self._params[f"filter__{field}__{op}"] = value
+        return self
+
+    def search(self, text):
+        self._params["search"] = text
+        return self
+
+    def order_by(self, *fields):
+        self._params["order_by"] = ",".join(fields)
+        return self
+
+    def include(self, *fields):
+        """Nur diese Felder übertragen (die ID kommt immer mit)."""
+        self._params["include"] = ",".join(fields)
+        return self
+
+    def size(self, n):
+        self._params["size"] = max(1, min(int(n), ROWS_PAGE_SIZE))
+        return self
+
+    def params(self):
+        return dict(self._params)
+
+
+# ---------------------------------------------------
+# 🔹 Baserow Client (eine gepoolte Session für alle Screens)
+# ---------------------------------------------------
+class BaserowClient:
+    """
+    Gemeinsamer HTTP-Client: Connection-Pool mit Keep-Alive, Auth-Header,
+    Basis-URL, Timeouts und Retry mit Backoff für idempotente Anfragen.
+    """
+    # Mindestabstand zwischen zwei Shortlink-Auflösungen nach Fehlern
+    RESOLVE_INTERVAL = 60
+
+    def __init__(self, timeout=(5, 10), pool_size=8, retries=3):
+        self.base_url = None
+        self.api_token = None
+        self.timeout = timeout
+        self.url_resolver = None  # liefert eine neue Basis-URL (Shortlink), siehe unten
+        self._resolve_lock = threading.Lock()
+        self._last_resolve = 0.0
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=1,  # ohne Netz schnell aufgeben, Schreibzugriffe landen dann in der Outbox
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "PATCH"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # --------------------------------------------
+    @property
+    def is_configured(self):
+        return bool(self.base_url and self.api_token)
+
+    def set_token(self, token):
+        self.api_token = token or None
+        if self.api_token:
+            self.session.headers.update({"Authorization": f"Token {self.api_token}"})
+        else:
+            self.session.headers.pop("Authorization", None)
+
+    def load_config(self):
+        """Ergänzt fehlende BASEROW_URL / API_TOKEN aus den Einstellungen."""
+        if not self.is_configured:
+            self.base_url = self.base_url or settings.get("BASEROW_URL")
+            if not self.api_token:
+                self.set_token(settings.get("API_TOKEN"))
+        return self.is_configured
+
+    # --------------------------------------------
+    def request(self, method, path, params=None, payload=None, timeout=None):
+        """
+        Roher Aufruf relativ zur Basis-URL, liefert das Response-Objekt.
+        Bei Verbindungsfehlern oder einem 404 außerhalb der API wird die
+        Basis-URL einmal neu über den Shortlink aufgelöst und erneut versucht.
+        """
+        query = {"user_field_names": "true"}
+        query.update(params or {})
+
+        def send():
+            return self._timed_request(method, path, query, payload, timeout or self.timeout)
+
+        try:
+            r = send()
+        except requests.ConnectionError:
+            if not self._refresh_base_url():
+                raise
+            return send()
+        if r.status_code == 404 and not self._is_api_error(r) and self._refresh_base_url():
+            return send()
+        return r
+
+    def _timed_request(self, method, path, query, payload, timeout):
+        """
+        session.request mit Messung. DNS/Connect/TLS lassen sich über requests nicht
+        getrennt erfassen: ttfb_ms (r.elapsed, bis zu den Headern) enthält sie,
+        new_conn zeigt über die Zähler der Pools, ob dafür neu verbunden wurde.
+        """
+        url = f"{self.base_url}{path}"
+        # Zeilen-IDs zusammenfassen, damit gleiche Aufrufe gemeinsam ausgewertet werden
+        name = method + " " + re.sub(r"(table/\d+/)\d+/", r"\1<row>/", path)
+        adapter = self.session.get_adapter(url)
+        connections = self._connection_count(adapter)
+        start = time.perf_counter()
+        try:
+            r = self.session.request(method, url, params=query, json=payload, timeout=timeout)
+        except requests.RequestException as e:
+            perf.record("api", name, time.perf_counter() - start, error=type(e).__name__)
+            raise
+        r.perf = perf.record("api", name, time.perf_counter() - start,
+                             status=r.status_code, bytes=len(r.content),
+                             ttfb_ms=round(r.elapsed.total_seconds() * 1000, 1),
+                             new_conn=self._connection_count(adapter) > connections)
+        return r
+
+    @staticmethod
+    def _connection_count(adapter):
+        """Bisher geöffnete Verbindungen aller Pools des Adapters (bei parallelen Requests ungefähr)."""
+        pools = adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    @staticmethod
+    def _is_api_error(r):
+        """True, wenn der 404 von Baserow selbst stammt (z.B. Zeile existiert nicht)."""
+        try:
+            return str(r.json().get("error", "")).startswith("ERROR_")
+        except ValueError:
+            return False
+
+    def _refresh_base_url(self):
+        """Löst die Basis-URL neu auf; True, wenn sich dabei etwas geändert hat."""
+        if self.url_resolver is None:
+            return False
+        with self._resolve_lock:
+            if time.time() - self._last_resolve < self.RESOLVE_INTERVAL:
+                return False
+            self._last_resolve = time.time()
+            old_url = self.base_url
+            new_url = self.url_resolver()
+        if new_url and new_url != old_url:
+            self.base_url = new_url
+            return True
+        return False
+
+    def request_json(self, method, path, params=None, payload=None):
+        """Liefert JSON bei Erfolg, sonst BaserowAPIError."""
+        r = self.request(method, path, params=params, payload=payload)
+        if r.status_code not in (200, 201):
+            raise BaserowAPIError(r.status_code, r.text)
+        body = r.json()
+        if isinstance(body, dict) and isinstance(body.get("results"), list):
+            r.perf["rows"] = len(body["results"])
+        return body
+
+    def iter_row_pages(self, table_id, size=ROWS_PAGE_SIZE, params=None):
+        """
+        Generator über alle Seiten von database/rows/table/<id>/.
+        Liefert jede Seite als Liste von Zeilen, solange die API einen next-Link meldet.
+        """
+        query = {"size": max(1, min(int(size), ROWS_PAGE_SIZE))}
+        query.update(params or {})
+        page = 1
+        while True:
+            query["page"] = page
+            body = self.request_json("GET", f"database/rows/table/{table_id}/", params=query)
+            yield body.get("results", [])
+            # next nur als Signal nutzen: hinter Proxies enthält der Link teils das falsche Schema
+            if not body.get("next"):
+                break
+            page += 1
+
+    def query_rows(self, table_id, query):
+        """Eine einzelne Seite für eine RowQuery, z.B. Existenzprüfung oder "neueste Zeile"."""
+        return self.request_json("GET", f"database/rows/table/{table_id}/", params=query.params())
+
+    def first_row(self, table_id, query):
+        """Erste Treffer-Zeile oder None."""
+        results = self.query_rows(table_id, query.size(1)).get("results", [])
+        return results[0] if results else None
+
+    def fetch_all_rows(self, table_id, size=ROWS_PAGE_SIZE, params=None):
+        """Alle Zeilen einer Tabelle über sämtliche Seiten."""
+        rows = []
+        for page_rows in self.iter_row_pages(table_id, size, params):
+            rows.extend(page_rows)
+        return rows
+
+    def get_row(self, table_id, row_id):
+        return self.request_json("GET", f"database/rows/table/{table_id}/{row_id}/")
+
+    def create_row(self, table_id, payload):
+        return self.request_json("POST", f"database/rows/table/{table_id}/", payload=payload)
+
+    def update_row(self, table_id, row_id, payload):
+        return self.request_json("PATCH", f"database/rows/table/{table_id}/{row_id}/", payload=payload)
+
+    def batch_create_rows(self, table_id, rows, on_chunk=None):
+        """
+        Legt Zeilen über den batch/-Endpunkt in Blöcken zu max. 200 an.
+        on_chunk(angelegt, gesamt) wird nach jedem Block aufgerufen (Hintergrund-Thread).
+        """
+        created = []
+        for start in range(0, len(rows), BATCH_SIZE):
+            chunk = rows[start:start + BATCH_SIZE]
+            body = self.request_json("POST", f"database/rows/table/{table_id}/batch/",
+                                     payload={"items": chunk})
+            created.extend(body.get("items", []))
+            if on_chunk is not None:
+                on_chunk(len(created), len(rows))
+        return created
+
+
+client = BaserowClient()
+
+
+# ---------------------------------------------------
+# 🔹 Lokaler Zeilen-Cache (SQLite im user_data_dir)
+# ---------------------------------------------------
+# Innerhalb der TTL kommen gecachte Tabellen ohne Netzwerkzugriff aus der Datenbank
+CACHE_TTL = 600
+# Baserow-Feld vom Typ "Zuletzt geändert"; fehlt es, wird nach Ablauf der TTL voll geladen
+CACHE_MODIFIED_FIELD = "Zuletzt geändert"
+
+# Projektion je gecachter Tabelle: nur die Felder der kompakten Datensätze
+# (PieceRecord, ProbeRecord) werden übertragen und gespeichert. Die Spielertabelle
+# (495) bleibt vollständig: ihr Schema ist unbekannt, player_display_name greift
+# notfalls auf das erste Textfeld zurück.
+CACHE_FIELDS = {
+    747: ("Name", "Heft/Noten", "Seite", "Komponist"),
+    749: ("Name", "Datum", "dabei waren", "entschuldigt", "aufgef. Stücke"),
+}
+
+
+class RowCache:
+    """
+    Persistenter Cache für Spieler (495), Stücke (747) und Proben (749).
+    Nach Ablauf der TTL werden nur Zeilen nachgeladen, deren "Zuletzt geändert"
+    seit dem letzten Abgleich liegt; stimmt danach die Zeilenanzahl nicht mit
+    dem Server überein (gelöschte Zeilen), wird die Tabelle komplett neu geladen.
+    Übertragen und gespeichert werden nur die Felder aus CACHE_FIELDS; ändert
+    sich die Projektion, wird die Tabelle ebenfalls neu geladen.
+    """
+    def __init__(self, client, ttl=CACHE_TTL, modified_field=CACHE_MODIFIED_FIELD, path=None,
+                 fields=CACHE_FIELDS):
+        self.client = client
+        self.ttl = ttl
+        self.modified_field = modified_field
+        self.fields = fields
+        self._path = path
+        self._conn = None
+        self._lock = threading.RLock()
+        # Tabellen mit aktivem Realtime-Abo: gelten ohne TTL als aktuell
+        self.live_tables = set()
+        self._versions = {}  # table_id -> Zähler, erhöht bei jeder Änderung (siehe RecordStore)
+
+    def _db(self):
+        if self._conn is None:
+            path = self._path or Path(App.get_running_app().user_data_dir) / "row_cache.sqlite3"
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rows (
+                    table_id INTEGER NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (table_id, row_id)
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    table_id INTEGER PRIMARY KEY,
+                    synced_at REAL NOT NULL,
+                    last_modified TEXT
+                );
+            """)
+            try:
+                # Ältere Caches: Spalte für die gespeicherte Projektion nachrüsten
+                self._conn.execute("ALTER TABLE meta ADD COLUMN fields TEXT")
+            except sqlite3.OperationalError:
+                pass
+        return self._conn
+
+    def _projection(self, table_id):
+        fields = self.fields.get(table_id)
+        return fields + (self.modified_field,) if fields else None
+
+    def _query(self, table_id):
+        """RowQuery mit der Projektion der Tabelle (ohne Projektion: alle Felder)."""
+        fields = self._projection(table_id)
+        return RowQuery().include(*fields) if fields else RowQuery()
+
+    def _project(self, table_id, row):
+        fields = self._projection(table_id)
+        if not fields:
+            return row
+        projected = {k: row[k] for k in fields if k in row}
+        projected["id"] = row["id"]
+        return projected
+
+    # --------------------------------------------
+    # Speicher
+    # --------------------------------------------
+    def _meta(self, table_id):
+        with self._lock:
+            return self._db().execute(
+                "SELECT synced_at, last_modified, fields FROM meta WHERE table_id = ?",
+                (table_id,)).fetchone()
+
+    def _count(self, table_id):
+        with self._lock:
+            return self._db().execute(
+                "SELECT COUNT(*) FROM rows WHERE table_id = ?", (table_id,)).fetchone()[0]
+
+    def cached_data(self, table_id):
+        """Alle gecachten Zeilen einer Tabelle als (row_id, JSON-Text), ohne Netzwerk."""
+        with self._lock:
+            return self._db().execute(
+                "SELECT row_id, data FROM rows WHERE table_id = ? ORDER BY row_id", (table_id,)).fetchall()
+
+    def _last_modified(self, rows, default=None):
+        values = [r.get(self.modified_field) for r in rows if r.get(self.modified_field)]
+        return max(values + ([default] if default else []), default=None)
+
+    def version(self, table_id):
+        return self._versions.get(table_id, 0)
+
+    def _bump(self, table_id):
+        self._versions[table_id] = self._versions.get(table_id, 0) + 1
+
+    def _write_meta(self, table_id, last_modified):
+        fields = self._projection(table_id)
+        self._db().execute(
+            "INSERT OR REPLACE INTO meta (table_id, synced_at, last_modified, fields) VALUES (?, ?, ?, ?)",
+            (table_id, time.time(), last_modified, ",".join(fields) if fields else None))
+
+    def replace_table(self, table_id, rows):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM rows WHERE table_id = ?", (table_id,))
+                db.executemany(
+                    "INSERT INTO rows (table_id, row_id, data) VALUES (?, ?, ?)",
+                    [(table_id, r["id"], json.dumps(self._project(table_id, r))) for r in rows])
+                self._write_meta(table_id, self._last_modified(rows))
+            self._bump(table_id)
+
+    def upsert_rows(self, table_id, rows):
+        """Neue/geänderte Zeilen übernehmen, z.B. direkt nach einem eigenen POST."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO rows (table_id, row_id, data) VALUES (?, ?, ?)",
+                    [(table_id, r["id"], json.dumps(self._project(table_id, r))) for r in rows])
+            if rows:
+                self._bump(table_id)
+
+    def delete_rows(self, table_id, row_ids):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "DELETE FROM rows WHERE table_id = ? AND row_id = ?",
+                    [(table_id, rid) for rid in row_ids])
+            self._bump(table_id)
+
+    def is_cached(self, table_id):
+        return self._meta(table_id) is not None
+
+    def invalidate(self, table_id):
+        """Gecachte Tabelle verwerfen (z.B. beim Logout): der nächste Zugriff lädt neu."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM meta WHERE table_id = ?", (table_id,))
+                db.execute("DELETE FROM rows WHERE table_id = ?", (table_id,))
+            self._bump(table_id)
+
+    def expire(self, table_id):
+        """TTL sofort ablaufen lassen: der nächste Zugriff gleicht per Delta ab."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("UPDATE meta SET synced_at = 0 WHERE table_id = ?", (table_id,))
+
+    # --------------------------------------------
+    # Abgleich mit Baserow (läuft im Hintergrund)
+    # --------------------------------------------
+    def _revalidate(self, table_id, last_modified):
+        """Lädt nur geänderte Zeilen nach. False, wenn ein voller Reload nötig ist."""
+        field = self.modified_field
+        start = time.perf_counter()
+        try:
+            changed = self.client.fetch_all_rows(
+                table_id,
+                params=self._query(table_id).filter(field, "date_after_or_equal", last_modified[:10]).params())
+            server_count = self.client.query_rows(table_id, RowQuery().include("id").size(1)).get("count")
+        except BaserowAPIError as e:
+            print(f"[WARN] Cache-Abgleich für Tabelle {table_id} nicht möglich:", e.status_code)
+            return False
+
+        with self._lock:
+            self.upsert_rows(table_id, changed)
+            if self._count(table_id) != server_count:
+                return False
+            with self._db():
+                self._write_meta(table_id, self._last_modified(changed, last_modified))
+        perf.record("cache", "revalidate", time.perf_counter() - start, table=table_id, rows=len(changed))
+        return True
+
+    def _is_fresh(self, table_id, meta):
+        if meta is None:
+            return False
+        synced_at, last_modified, fields = meta
+        projection = self._projection(table_id)
+        if fields != (",".join(projection) if projection else None):
+            return False
+        if table_id in self.live_tables or time.time() - synced_at < self.ttl:
+            return True
+        return bool(last_modified) and self._revalidate(table_id, last_modified)
+
+    def _serve_stale(self, table_id, meta, error):
+        """Offline mit vorhandener Kopie: veraltete Zeilen verwenden, sonst Fehler weitergeben."""
+        if meta is None or not is_offline_error(error):
+            raise error
+        print(f"[WARN] Offline – Tabelle {table_id} aus dem Cache (evtl. veraltet)")
+
+    def sync(self, table_id):
+        """Bringt den Cache auf den aktuellen Stand, ohne Zeilen zu dekodieren."""
+        meta = self._meta(table_id)
+        try:
+            if not self._is_fresh(table_id, meta):
+                self.replace_table(table_id, self.client.fetch_all_rows(
+                    table_id, params=self._query(table_id).params()))
+        except Exception as e:
+            self._serve_stale(table_id, meta, e)
+
+
+row_cache = RowCache(client)
+
+
+# ---------------------------------------------------
+# 🔹 Kompakte Datensätze (gemeinsam für alle Screens)
+# ---------------------------------------------------
+def _intern(value):
+    """Wiederkehrende Texte (Heft, Komponist …) nur einmal im Speicher halten."""
+    return sys.intern(str(value).strip()) if value else ""
+
+def _link_tuple(value):
+    return tuple(item["id"] for item in value or () if isinstance(item, dict) and "id" in item)
+
+
+class PieceRecord:
+    """Stück aus Tabelle 747, nur die Felder für Auswahl, Suche und Statistik."""
+    __slots__ = ("id", "name", "heft", "seite", "komponist")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.name = str(row.get("Name") or "Unbenannt").strip()
+        self.heft = _intern(row.get("Heft/Noten"))
+        self.seite = _intern(row.get("Seite"))
+        self.komponist = _intern(row.get("Komponist"))
+
+    @classmethod
+    def local(cls, piece_id, name):
+        """Noch nicht in Baserow angelegtes Stück (temporäre ID, siehe PieceRegistry)."""
+        return cls({"id": piece_id, "Name": name})
+
+
+_LETTER_RE = re.compile(r"[A-Za-zÄÖÜäöüß]")
+
+
+class PlayerRecord:
+    """
+    Spieler aus Tabelle 495. Anzeigename, Gültigkeit (enthält Buchstaben) und
+    Sortierschlüssel (Nachname, dann voller Name; Umlaute wie Grundbuchstaben,
+    ß wie ss) werden einmal pro Zeilenstand berechnet.
+    """
+    __slots__ = ("id", "display", "valid", "sort_key")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.display = player_display_name(row)
+        self.valid = _LETTER_RE.search(self.display) is not None
+        full = normalize_search_text(self.display)
+        self.sort_key = (full.split()[-1] if full.split() else "", full, self.display)
+
+
+class ProbeRecord:
+    """Probe aus Tabelle 749; Link-Felder nur als ID-Tupel."""
+    __slots__ = ("id", "name", "datum", "dabei", "entschuldigt", "stuecke")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.name = row.get("Name") or "Unbenannt"
+        self.datum = _intern((row.get("Datum") or "")[:10])
+        self.dabei = _link_tuple(row.get("dabei waren"))
+        self.entschuldigt = _link_tuple(row.get("entschuldigt"))
+        self.stuecke = _link_tuple(row.get("aufgef. Stücke"))
+
+
+RECORD_TYPES = {747: PieceRecord, 495: PlayerRecord, 749: ProbeRecord}
+
+
+class RecordStore:
+    """
+    Dekodiert gecachte Tabellen einmal in kompakte Datensätze und teilt die
+    Liste zwischen allen Screens. Neu aufgebaut wird nur, wenn sich der Cache
+    seitdem geändert hat (RowCache.version), und auch dann werden nur Zeilen
+    dekodiert, deren gespeicherter Text sich geändert hat (erkannt am Hash, der
+    Text selbst wird nicht behalten). Die Listen nicht verändern.
+    """
+    def __init__(self, cache, types=RECORD_TYPES):
+        self.cache = cache
+        self.types = types
+        self._records = {}  # table_id -> (Version, [Datensätze])
+        self._by_row = {}   # table_id -> {row_id: (Hash des JSON-Texts, Datensatz)}
+        self._lock = threading.Lock()
+
+    def get(self, table_id):
+        self.cache.sync(table_id)
+        with self._lock:
+            version = self.cache.version(table_id)
+            cached = self._records.get(table_id)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            record_type = self.types[table_id]
+            previous = self._by_row.get(table_id, {})
+            by_row = {}
+            for row_id, data in self.cache.cached_data(table_id):
+                digest = hash(data)
+                known = previous.get(row_id)
+                if known is None or known[0] != digest:
+                    known = (digest, record_type(json.loads(data)))
+                by_row[row_id] = known
+            records = [record for _, record in by_row.values()]
+            self._by_row[table_id] = by_row
+            self._records[table_id] = (version, records)
+            return records
+
+
+records = RecordStore(row_cache)
+
+
+# ---------------------------------------------------
+# 🔹 Offline-Warteschlange für Schreibzugriffe
+# ---------------------------------------------------
+OUTBOX_SYNC_INTERVAL = 30
+
+
+def is_offline_error(e):
+    """True bei Verbindungsproblemen (kein Netz, Timeout), nicht bei API-Fehlern."""
+    return isinstance(e, (requests.ConnectionError, requests.Timeout))
+
+
+class Outbox:
+    """
+    Dauerhaftes Journal (outbox.json im user_data_dir) für PATCH/POST,
+    die ohne Netz nicht gesendet werden konnten. flush() spielt sie in
+    Reihenfolge nach; mehrere PATCHes auf dieselbe Zeile werden zu einem
+    zusammengefasst.
+    """
+    def __init__(self, client, path=None):
+        self.client = client
+        self._path = path
+        self._ops = None
+        self._next_id = 1
+        self._flushing = False
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)  # signalisiert das Ende eines flush()
+        self._awaited = {}  # Op-ID -> verwerfender Fehler, für Ops, auf die send() wartet
+
+    def _file(self):
+        return self._path or Path(App.get_running_app().user_data_dir) / "outbox.json"
+
+    def _load(self):
+        if self._ops is None:
+            path = self._file()
+            data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            self._ops = data.get("ops", [])
+            self._next_id = data.get("next_id", 1)
+        return self._ops
+
+    def _save(self):
+        # Atomar schreiben, damit ein Abbruch das Journal nicht zerstört
+        path = self._file()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"next_id": self._next_id, "ops": self._ops}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @property
+    def pending_count(self):
+        with self._lock:
+            return len(self._load())
+
+    def enqueue(self, method, table_id, row_id=None, payload=None, skip_if_exists=None):
+        """
+        Vormerken einer Operation. skip_if_exists=(Feld, Filtertyp, Wert) verhindert
+        beim Nachspielen doppelte Zeilen (z.B. Probe mit gleichem Datum).
+        Liefert die ID der Op (bei zusammengefassten PATCHes die der bestehenden).
+        """
+        with self._lock:
+            ops = self._load()
+            if method == "PATCH":
+                for op in ops:
+                    if (op["method"] == "PATCH" and op["table_id"] == table_id
+                            and op["row_id"] == row_id and not op.get("sending")):
+                        op["payload"].update(payload)
+                        self._save()
+                        return op["id"]
+            ops.append({
+                "id": self._next_id,
+                "method": method,
+                "table_id": table_id,
+                "row_id": row_id,
+                "payload": dict(payload or {}),
+                "skip_if_exists": list(skip_if_exists) if skip_if_exists else None,
+            })
+            self._next_id += 1
+            self._save()
+            return ops[-1]["id"]
+
+    def _execute(self, op):
+        table_id = op["table_id"]
+        if op["method"] == "PATCH":
+            row = self.client.update_row(table_id, op["row_id"], op["payload"])
+        else:
+            if op.get("skip_if_exists"):
+                field, filter_type, value = op["skip_if_exists"]
+                if self.client.first_row(table_id, RowQuery().filter(field, filter_type, value).include(field)):
+                    print(f"[INFO] Outbox: {field}={value} existiert bereits, übersprungen")
+                    return None
+            row = self.client.create_row(table_id, op["payload"])
+        # Gecachte Tabellen direkt mitführen, damit kein erneuter Download nötig ist
+        if row and row_cache.is_cached(table_id):
+            row_cache.upsert_rows(table_id, [row])
+        return row
+
+    def send(self, method, table_id, row_id=None, payload=None, skip_if_exists=None):
+        """
+        Schreibt direkt oder – ohne Netz bzw. bei noch wartenden Operationen,
+        damit die Reihenfolge erhalten bleibt – über das Journal.
+        Liefert ("sent", Zeile) oder ("queued", Anzahl ausstehend); Zeile ist None,
+        wenn über das Journal gesendet oder wegen skip_if_exists übersprungen wurde.
+        Verwirft der Server die Operation beim Nachspielen, wird der Fehler ausgelöst.
+        """
+        if self.pending_count == 0:
+            op = {"method": method, "table_id": table_id, "row_id": row_id,
+                  "payload": payload, "skip_if_exists": skip_if_exists}
+            try:
+                return "sent", self._execute(op)
+            except Exception as e:
+                if not is_offline_error(e):
+                    raise
+        op_id = self.enqueue(method, table_id, row_id, payload, skip_if_exists)
+        with self._lock:
+            self._awaited[op_id] = None
+        try:
+            # Läuft schon ein Abgleich, auf ihn warten statt voreilig "queued" zu melden
+            self.flush(wait=True)
+        finally:
+            with self._lock:
+                error = self._awaited.pop(op_id, None)
+                queued = any(op["id"] == op_id for op in self._load())
+                pending = len(self._ops)
+        if error is not None:
+            raise error
+        return ("queued", pending) if queued else ("sent", None)
+
+    def flush(self, wait=False):
+        """
+        Spielt das Journal in Reihenfolge ab (läuft im Hintergrund). Läuft bereits ein
+        Abgleich, wartet wait=True auf dessen Ende und spielt dann weiter, sonst (0, 0).
+        Liefert (gesendet, verworfen).
+        """
+        with self._lock:
+            while self._flushing:
+                if not wait:
+                    return 0, 0
+                self._idle.wait()
+            self._flushing = True
+        sent = dropped = 0
+        try:
+            while True:
+                with self._lock:
+                    ops = self._load()
+                    if not ops:
+                        break
+                    op = ops[0]
+                    op["sending"] = True
+                try:
+                    self._execute(op)
+                except Exception as e:
+                    with self._lock:
+                        op.pop("sending", None)
+                    if is_offline_error(e) or (isinstance(e, BaserowAPIError) and e.status_code >= 500):
+                        break  # später erneut versuchen
+                    # Dauerhafter Fehler (z.B. 400): verwerfen, sonst blockiert die Queue
+                    print("[ERROR] Outbox: Operation verworfen:", op, e)
+                    with self._lock:
+                        if op["id"] in self._awaited:
+                            self._awaited[op["id"]] = e
+                    dropped += 1
+                else:
+                    sent += 1
+                with self._lock:
+                    self._ops = [o for o in self._ops if o["id"] != op["id"]]
+                    self._save()
+        finally:
+            with self._lock:
+                self._flushing = False
+                self._idle.notify_all()
+        return sent, dropped
+
+
+outbox = Outbox(client)
+
 # ---------------------------------------------------
 # 🔹 Hilfsfunktionen für Android
-def get_env_path():
-    """Pfad für lokale .env im Android App-Speicher"""
-    app = App.get_running_app()
-    env_path = Path(app.user_data_dir) / ".env"
-    return env_path
-
-def load_local_env():
-    """Lädt die .env aus dem lokalen App-Speicher"""
-    env_path = get_env_path()
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path)
-    return env_path
-
-def save_env_variable(key, value):
-    """Speichert einen Key in der lokalen .env"""
-    env_path = get_env_path()
-    env_path.touch(exist_ok=True)
-    set_key(str(env_path), key, value)
+class Settings:
+    """
+    Einstellungen aus der lokalen .env im App-Speicher (Android: user_data_dir).
+    Wird einmal gelesen und im Speicher gehalten; Änderungen werden gebündelt
+    und atomar zurückgeschrieben.
+    """
+    FLUSH_DELAY = 0.5
+
+    def __init__(self, path=None):
+        self._path = path
+        self._values = None
+        self._dirty = False
+        self._flush_scheduled = False
+        self._lock = threading.RLock()
+
+    def _file(self):
+        return self._path or Path(App.get_running_app().user_data_dir) / ".env"
+
+    def _load(self):
+        if self._values is None:
+            path = self._file()
+            self._values = dict(dotenv_values(path)) if path.exists() else {}
+        return self._values
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._load().get(key)
+        return value if value else default
+
+    def set(self, key, value):
+        """Wert sofort im Speicher ändern, Schreiben auf die Platte erfolgt gebündelt."""
+        with self._lock:
+            values = self._load()
+            if values.get(key) == value:
+                return
+            values[key] = value
+            self._dirty = True
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        Clock.schedule_once(lambda dt: self.flush(), self.FLUSH_DELAY)
+
+    def flush(self):
+        with self._lock:
+            self._flush_scheduled = False
+            if not self._dirty:
+                return
+            path = self._file()
+            lines = [f"{k}={json.dumps(v or '', ensure_ascii=False)}" for k, v in self._values.items()]
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            os.replace(tmp, path)
+            self._dirty = False
+
+
+settings = Settings()
 
 def verify_or_refresh_baserow_url(status_label=None):
     """
     Prüft BASEROW_URL oder holt sie über den Shortlink neu.
     Entfernt /login, hängt /api/ an und speichert in .env.
     """
-    env_path = load_local_env()
-    baserow_url = os.getenv("BASEROW_URL")
+    baserow_url = settings.get("BASEROW_URL")
 
     try:
         # Shortlink aufrufen
@@ -69,7 +1032,8 @@ def verify_or_refresh_baserow_url(status_label=None):
             if not final_url.endswith("/api/"):
                 final_url = final_url.rstrip("/") + "/api/"
             baserow_url = final_url
-            save_env_variable("BASEROW_URL", final_url)
+            client.base_url = final_url
+            settings.set("BASEROW_URL", final_url)
             msg = f"[INFO] BASEROW_URL aktualisiert: {final_url}"
             if status_label:
                 status_label.text = msg
@@ -87,23 +1051,19 @@ def verify_or_refresh_baserow_url(status_label=None):
 
     return baserow_url
 
+# Bei Verbindungsfehlern/404 löst der Client die URL selbst neu auf (im Hintergrund-Thread)
+client.url_resolver = verify_or_refresh_baserow_url
+
 def login_to_baserow(status_label=None):
     """Login via API Token, angepasst für Android"""
-    load_local_env()
-    base_url = os.getenv("BASEROW_URL")
-    api_token = os.getenv("API_TOKEN")
-
-    if not base_url or not api_token:
+    if not client.load_config():
         if status_label:
             status_label.text = "[WARN] Keine BASEROW_URL oder API_TOKEN in .env"
         print("[WARN] Keine BASEROW_URL oder API_TOKEN in .env")
         return False
 
-    session.headers.update({"Authorization": f"Token {api_token}"})
-
-    test_url = f"{base_url}database/rows/table/749/?user_field_names=true"
     try:
-        r = session.get(test_url)
+        r = client.request("GET", "database/rows/table/749/", params={"size": 1})
         if r.status_code == 200:
             if status_label:
                 status_label.text = "[OK] API Token gültig, Login erfolgreich ✅"
@@ -120,14 +1080,198 @@ def login_to_baserow(status_label=None):
         print(f"[ERROR] Fehler beim Token-Test: {e}")
         return False
 
+
+# ---------------------------------------------------
+# 🔹 Realtime (Baserow WebSocket ws/core/)
+# ---------------------------------------------------
+try:
+    import websocket  # websocket-client, optional
+except ImportError:
+    websocket = None
+
+REALTIME_TABLES = (749, 495, 747)
+# Wartezeiten zwischen Verbindungsversuchen (Sekunden), danach bleibt es beim letzten Wert
+REALTIME_BACKOFF = (1, 2, 5, 10, 30, 60)
+
+
+class RealtimeSync:
+    """
+    Abonniert Zeilenereignisse der Tabellen über Baserows WebSocket und
+    überträgt sie in den RowCache und an registrierte Listener (Mainthread).
+    Der WebSocket akzeptiert nur JWTs, keine Datenbank-Tokens. Dafür meldet
+    sich der Nutzer beim Login einmal mit E-Mail/Passwort an; behalten wird nur
+    der Refresh-Token (BASEROW_REFRESH_TOKEN), aus dem vor jeder Verbindung ein
+    kurzlebiger JWT geholt wird. Ohne Refresh-Token bleibt Realtime aus und
+    der Cache gleicht wie bisher nach Ablauf der TTL ab.
+    """
+    def __init__(self, client, cache, tables=REALTIME_TABLES, ws_url=None):
+        self.client = client
+        self.cache = cache
+        self.tables = tuple(tables)
+        self.ws_url = ws_url  # überschreibbar, z.B. für einen lokalen Test-Server
+        self._listeners = []
+        self._field_names = {}  # table_id -> {"field_123": "Name"}
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws = None
+        self.refresh_token = None
+
+    def add_listener(self, callback):
+        """callback(table_id, kind, rows, row_ids) mit kind "created"/"updated"/"deleted"."""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        if websocket is None:
+            print("[INFO] Realtime aus: websocket-client nicht installiert")
+            return False
+        self.refresh_token = self.refresh_token or settings.get("BASEROW_REFRESH_TOKEN")
+        if not self.refresh_token:
+            print("[INFO] Realtime aus: keine Baserow-Anmeldung (E-Mail/Passwort beim Login)")
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="baserow-realtime", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            # abort() weckt den blockierten recv() im Realtime-Thread sofort auf
+            ws.abort()
+        self.cache.live_tables.clear()
+
+    def login(self, email, password, save=False):
+        """
+        Tauscht E-Mail/Passwort gegen einen Refresh-Token (läuft im Hintergrund).
+        Das Passwort wird nicht gespeichert, der Token nur mit save=True.
+        """
+        body = self.client.request_json("POST", "user/token-auth/",
+                                        payload={"email": email, "password": password})
+        self.refresh_token = body.get("refresh_token")
+        settings.set("BASEROW_REFRESH_TOKEN", self.refresh_token if save else "")
+        return self.refresh_token is not None
+
+    def logout(self):
+        """Realtime beenden und den Refresh-Token verwerfen."""
+        self.stop()
+        self.refresh_token = None
+        settings.set("BASEROW_REFRESH_TOKEN", "")
+
+    # --------------------------------------------
+    # Verbindung (eigener Thread)
+    # --------------------------------------------
+    def _authenticate(self):
+        try:
+            body = self.client.request_json("POST", "user/token-refresh/",
+                                            payload={"refresh_token": self.refresh_token})
+        except BaserowAPIError as e:
+            if e.status_code in (400, 401):
+                # Refresh-Token abgelaufen oder widerrufen: erst nach neuem Login wieder
+                print("[WARN] Realtime: Anmeldung abgelaufen, bitte erneut mit E-Mail/Passwort einloggen")
+                self.logout()
+            raise
+        if body.get("refresh_token"):
+            # Rotierte Tokens nur ersetzen, wenn der alte gespeichert war
+            if settings.get("BASEROW_REFRESH_TOKEN"):
+                settings.set("BASEROW_REFRESH_TOKEN", body["refresh_token"])
+            self.refresh_token = body["refresh_token"]
+        return body.get("access_token") or body.get("token")
+
+    def _url(self, jwt):
+        if self.ws_url:
+            base = self.ws_url
+        else:
+            root = self.client.base_url.rstrip("/")
+            if root.endswith("/api"):
+                root = root[:-len("/api")]
+            base = re.sub(r"^http", "ws", root) + "/ws/core/"
+        return f"{base}?jwt_token={jwt}"
+
+    def _load_field_names(self, table_id):
+        fields = self.client.request_json("GET", f"database/fields/table/{table_id}/")
+        self._field_names[table_id] = {f"field_{f['id']}": f["name"] for f in fields}
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                jwt = self._authenticate()
+                for table_id in self.tables:
+                    self._load_field_names(table_id)
+                self._ws = websocket.create_connection(self._url(jwt), timeout=30)
+                self._ws.settimeout(None)
+                for table_id in self.tables:
+                    self._ws.send(json.dumps({"page": "table", "table_id": table_id}))
+                print("[INFO] Realtime verbunden")
+                attempt = 0
+                # Während der Trennung verpasste Änderungen per Delta-Abgleich nachholen
+                for table_id in self.tables:
+                    if self.cache.is_cached(table_id):
+                        self.cache.expire(table_id)
+                        self.cache.sync(table_id)
+                    self.cache.live_tables.add(table_id)
+                while not self._stop.is_set():
+                    message = self._ws.recv()
+                    if not message:
+                        break
+                    self._handle(json.loads(message))
+            except Exception as e:
+                if not self._stop.is_set():
+                    print("[WARN] Realtime getrennt:", e)
+            finally:
+                self.cache.live_tables.clear()
+                if self._ws is not None:
+                    try:
+                        self._ws.close(timeout=1)
+                    except Exception:
+                        pass
+                    self._ws = None
+            delay = REALTIME_BACKOFF[min(attempt, len(REALTIME_BACKOFF) - 1)]
+            attempt += 1
+            self._stop.wait(delay)
+
+    # --------------------------------------------
+    # Ereignisse
+    # --------------------------------------------
+    def _translate(self, table_id, row):
+        names = self._field_names.get(table_id, {})
+        return {names.get(k, k): v for k, v in row.items()}
+
+    def _handle(self, event):
+        table_id = event.get("table_id")
+        if table_id not in self.tables:
+            return
+        kind = event.get("type", "")
+        rows, row_ids = [], []
+        if kind in ("rows_created", "rows_updated", "row_created", "row_updated"):
+            raw = event.get("rows") or [event.get("row")]
+            rows = [self._translate(table_id, r) for r in raw if r]
+            row_ids = [r["id"] for r in rows]
+            if self.cache.is_cached(table_id):
+                self.cache.upsert_rows(table_id, rows)
+        elif kind in ("rows_deleted", "row_deleted"):
+            row_ids = event.get("row_ids") or [event.get("row_id")]
+            if self.cache.is_cached(table_id):
+                self.cache.delete_rows(table_id, row_ids)
+        else:
+            return
+        kind = kind.split("_")[1]
+        for callback in list(self._listeners):
+            Clock.schedule_once(lambda dt, cb=callback: cb(table_id, kind, rows, row_ids), 0)
+
+
+realtime = RealtimeSync(client, row_cache)
+
 # ---------------------------------------------------
 # 🔹 Screens
 # ---------------------------------------------------
 class LoginScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        load_local_env()
-        api_token = os.getenv("API_TOKEN", "")
+        api_token = settings.get("API_TOKEN", "")
 
         layout = BoxLayout(orientation="vertical", padding=10, spacing=5)
 
@@ -142,8 +1286,15 @@ class LoginScreen(Screen):
         self.toggle_btn.bind(on_release=self.toggle_token)
         layout.add_widget(self.toggle_btn)
 
+        # Baserow-Konto nur für Live-Aktualisierung; gespeichert wird nur der Refresh-Token
+        layout.add_widget(Label(text="Baserow-Konto (optional, für Live-Aktualisierung)"))
+        self.email_input = TextInput(hint_text="E-Mail", multiline=False)
+        layout.add_widget(self.email_input)
+        self.password_input = TextInput(hint_text="Passwort", multiline=False, password=True)
+        layout.add_widget(self.password_input)
+
         self.save_cb = CheckBox(active=bool(api_token))
-        layout.add_widget(Label(text="Token speichern"))
+        layout.add_widget(Label(text="Anmeldung speichern"))
         layout.add_widget(self.save_cb)
 
         login_btn = Button(text="Login")
@@ -151,9 +1302,7 @@ class LoginScreen(Screen):
         layout.add_widget(login_btn)
 
         self.add_widget(layout)
-
-        if api_token:
-            Clock.schedule_once(lambda dt: self.try_login(auto=True), 0.1)
+        # Auto-Login mit gespeichertem Token übernimmt BaserowApp.attempt_login
 
     def toggle_token(self, instance):
         self.token_input.password = not self.token_input.password
@@ -167,29 +1316,53 @@ class LoginScreen(Screen):
             self.status_label.text = "Token fehlt!"
             return
 
-        session.headers.update({"Authorization": f"Token {token}"})
-
-        load_local_env()
-        base_url = os.getenv("BASEROW_URL")
-        if not base_url:
-            base_url = verify_or_refresh_baserow_url(self.status_label)
+        email = self.email_input.text.strip()
+        password = self.password_input.text
+        # Passwort nicht länger als nötig im Eingabefeld halten
+        self.password_input.text = ""
+
+        self.status_label.text = "Login läuft …"
+        dispatcher.submit(self, self._check_token, token, email, password, save,
+                          on_success=lambda result: self._on_login_result(result, token, save),
+                          on_error=self._on_login_error)
+
+    def _check_token(self, token, email="", password="", save=False):
+        """
+        Testet den Token gegen Tabelle 749 und meldet, falls angegeben, das
+        Baserow-Konto für Realtime an (läuft im Hintergrund).
+        """
+        client.set_token(token)
+        if not client.load_config():
+            client.base_url = verify_or_refresh_baserow_url()
+
+        r = client.request("GET", "database/rows/table/749/", params={"size": 1})
+        realtime_error = None
+        if r.status_code == 200 and email and password:
+            try:
+                realtime.login(email, password, save=save)
+            except BaserowAPIError as e:
+                realtime_error = e.status_code
+        return r.status_code, r.text, realtime_error
+
+    def _on_login_result(self, result, token, save):
+        status_code, text, realtime_error = result
+        if realtime_error is not None:
+            print("[WARN] Baserow-Anmeldung für Realtime fehlgeschlagen:", realtime_error)
+        if status_code == 200:
+            self.status_label.text = "Hauptmenü"
+            print("[OK] Login erfolgreich mit API Token ✅")
+            if save:
+                settings.set("API_TOKEN", token)
+            realtime.start()
+            if self.manager:
+                self.manager.current = "main_menu"
+        else:
+            self.status_label.text = "Login fehlgeschlagen"
+            print("[WARN] Login fehlgeschlagen", status_code, text)
 
-        test_url = f"{base_url}database/rows/table/749/?user_field_names=true"
-        try:
-            r = session.get(test_url, timeout=10)
-            if r.status_code == 200:
-                self.status_label.text = "Hauptmenü"
-                print("[OK] Login erfolgreich mit API Token ✅")
-                if save:
-                    save_env_variable("API_TOKEN", token)
-                if self.manager:
-                    self.manager.current = "main_menu"
-            else:
-                self.status_label.text = "Login fehlgeschlagen"
-                print("[WARN] Login fehlgeschlagen", r.status_code, r.text)
-        except Exception as e:
-            self.status_label.text = f"Login Fehler: {e}"
-            print("[ERROR] Login Exception:", e)
+    def _on_login_error(self, e):
+        self.status_label.text = f"Login Fehler: {e}"
+        print("[ERROR] Login Exception:", e)
 
 
 
@@ -208,6 +1381,8 @@ class MainMenu(Screen):
         layout.add_widget(Button(text="Event hinzufügen", on_release=self.add_event))
         layout.add_widget(Button(text="Event editieren", on_release=self.edit_event))
         layout.add_widget(Button(text="Notenstücke hinzufügen", on_release=self.add_sheetmusic))
+        layout.add_widget(Button(text="Anwesenheitsstatistik", on_release=self.attendance))
+        layout.add_widget(Button(text="Stückhäufigkeit", on_release=self.piece_stats))
 
 
         # Logout-Button
@@ -219,13 +1394,14 @@ class MainMenu(Screen):
     def on_pre_enter(self):
         """Label zurücksetzen, wenn MainMenu betreten wird"""
         if hasattr(self, 'status_label'):
-            self.status_label.text = "Hauptmenü"
+            pending = outbox.pending_count
+            self.status_label.text = f"Hauptmenü – {pending} Änderungen warten auf Sync" if pending else "Hauptmenü"
 
     def add_probe(self, instance):
-        self.manager.current = "add_probe"
+        show_screen(self.manager, "add_probe")
 
     def edit_probe(self, instance):
-        self.manager.current = "edit_probe"
+        show_screen(self.manager, "edit_probe")
 
     def add_event(self, instance):
         Popup(title="Info",
@@ -238,14 +1414,25 @@ class MainMenu(Screen):
               size_hint=(0.6, 0.4)).open()
 
     def add_sheetmusic(self, instance):
-        self.manager.current="add_sheet_music"
+        show_screen(self.manager, "add_sheet_music")
+
+    def attendance(self, instance):
+        show_screen(self.manager, "attendance_stats")
+
+    def piece_stats(self, instance):
+        show_screen(self.manager, "piece_stats")
 
     def logout(self, instance):
-        # Token aus Session entfernen
-        session.headers.pop("Authorization", None)
+        # Token aus Session entfernen, Realtime-Abo beenden
+        client.set_token(None)
+        realtime.logout()
+
+        # Lokale Kopien der Tabellen gehören zur Sitzung
+        for table_id in RECORD_TYPES:
+            row_cache.invalidate(table_id)
         
         # API_TOKEN in .env löschen
-        set_key(".env", "API_TOKEN", "")
+        settings.set("API_TOKEN", "")
         
         print("[INFO] Benutzer ausgeloggt")
         
@@ -260,6 +1447,44 @@ class MainMenu(Screen):
 
 
 
+# ---------------------------------------------------
+# 🔹 Proben-Namen & Serien
+# ---------------------------------------------------
+WEEKDAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
+
+def last_regular_probe_query():
+    """Neueste normale Probe (ohne Sonderproben)."""
+    return (RowQuery()
+            .filter("Name", "contains", "Probe")
+            .filter("Name", "contains_not", "Sonder")
+            .order_by("-Datum")
+            .include("Name", "Datum"))
+
+def next_probe_name(name, step=1):
+    """Zählt die erste Zahl im Namen hoch ("Probe 041" -> "Probe 042")."""
+    match = re.search(r"(\d+)", name)
+    if match:
+        nummer = int(match.group(1)) + step
+        return re.sub(r"(\d+)", f"{nummer:03}", name, 1)
+    return f"{name} {step:03}"
+
+def generate_probe_series(first_name, start, end, weekday, skip_dates=()):
+    """
+    Proben für jeden gewählten Wochentag zwischen start und end (inklusive).
+    Bereits belegte Daten werden übersprungen und verbrauchen keine Nummer.
+    """
+    skip = set(skip_dates)
+    day = start + timedelta(days=(weekday - start.weekday()) % 7)
+    rows, name = [], first_name
+    while day <= end:
+        datum = day.isoformat()
+        if datum not in skip:
+            rows.append({"Name": name, "Datum": datum})
+            name = next_probe_name(name)
+        day += timedelta(days=7)
+    return rows
+
+
 class AddProbeScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -280,49 +1505,40 @@ class AddProbeScreen(Screen):
         create_btn.bind(on_release=self.create_probe)
         layout.add_widget(create_btn)
 
+        series_btn = Button(text="Probenserie anlegen")
+        series_btn.bind(on_release=lambda inst: show_screen(self.manager, "bulk_probe"))
+        layout.add_widget(series_btn)
+
         back_btn = Button(text="Zurück")
         back_btn.bind(on_release=self.go_back)
         layout.add_widget(back_btn)
 
         self.add_widget(layout)
+
+    def on_pre_enter(self):
         self.prefill_last_probe()
 
+    def on_leave(self):
+        dispatcher.cancel(self)
+
     def prefill_last_probe(self):
         """Ermittelt die letzte normale Probe und zählt die Nummer +1 hoch."""
-        try:
-            load_local_env()
-            base_url = os.getenv("BASEROW_URL")
-            api_token = os.getenv("API_TOKEN")
-            if not base_url or not api_token:
-                self.status_label.text = "Keine BASEROW_URL oder API_TOKEN vorhanden"
-                return
-
-            headers = {"Authorization": f"Token {api_token}"}
-
-            api_url = f"{base_url}database/rows/table/749/?user_field_names=true"
-            response = requests.get(api_url, headers=headers, timeout=10)
-
-            if response.status_code != 200:
-                self.status_label.text = f"Fehler beim Abruf: {response.status_code}"
-                print("[ERROR] GET rows:", response.text)
-                return
+        if not client.load_config():
+            self.status_label.text = "Keine BASEROW_URL oder API_TOKEN vorhanden"
+            return
 
-            data = response.json().get("results", [])
-            proben = [p for p in data if "Probe" in p.get("Name", "") and "Sonder" not in p.get("Name", "")]
+        # Nur die neueste normale Probe abfragen statt der ganzen Tabelle
+        dispatcher.submit(self, client.first_row, 749, last_regular_probe_query(),
+                          on_success=self._on_prefill_row,
+                          on_error=self._on_prefill_error)
 
-            if not proben:
+    def _on_prefill_row(self, letzte):
+        try:
+            if letzte is None:
                 self.status_label.text = "Keine normalen Proben gefunden"
                 return
 
-            proben.sort(key=lambda x: x.get("Datum", ""), reverse=True)
-            letzte = proben[0]
-
-            match = re.search(r"(\d+)", letzte.get("Name", ""))
-            if match:
-                nummer = int(match.group(1)) + 1
-                neuer_name = re.sub(r"(\d+)", f"{nummer:03}", letzte["Name"], 1)
-            else:
-                neuer_name = letzte["Name"] + " 001"
+            neuer_name = next_probe_name(letzte["Name"])
 
             self.name_input.text = neuer_name
             self.date_input.text = date.today().isoformat()
@@ -330,63 +1546,363 @@ class AddProbeScreen(Screen):
             print(f"[DEBUG] Letzte Probe: {letzte['Name']}, neuer Name: {neuer_name}")
 
         except Exception as e:
-            self.status_label.text = f"Fehler: {e}"
-            print("prefill_last_probe ERROR:", e)
+            self._on_prefill_error(e)
+
+    def _on_prefill_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler beim Abruf: {e.status_code}"
+            print("[ERROR] GET rows:", e.text)
+            return
+        self.status_label.text = f"Fehler: {e}"
+        print("prefill_last_probe ERROR:", e)
 
     def create_probe(self, instance):
         """Erstellt eine neue Probe, prüft auf Duplikate nach Datum."""
-        try:
-            load_local_env()
-            base_url = os.getenv("BASEROW_URL")
-            api_token = os.getenv("API_TOKEN")
-            if not base_url or not api_token:
-                self.status_label.text = "Keine BASEROW_URL oder API_TOKEN vorhanden"
-                return
+        if not client.load_config():
+            self.status_label.text = "Keine BASEROW_URL oder API_TOKEN vorhanden"
+            return
 
-            headers = {"Authorization": f"Token {api_token}"}
-            name = self.name_input.text.strip()
-            datum = self.date_input.text.strip()
+        name = self.name_input.text.strip()
+        datum = self.date_input.text.strip()
 
-            if not name or not datum:
-                self.status_label.text = "Name und Datum müssen ausgefüllt sein"
-                return
+        if not name or not datum:
+            self.status_label.text = "Name und Datum müssen ausgefüllt sein"
+            return
 
-            # API-Endpunkt für Tabelle 749
-            api_url = f"{base_url}database/rows/table/749/?user_field_names=true"
+        self.status_label.text = f"Erstelle Probe '{name}' …"
+        # Schreibzugriff: nicht an den Screen gebunden, damit er beim Verlassen nicht verloren geht
+        dispatcher.submit(None, self._create_probe_request, name, datum,
+                          on_success=lambda result: self._on_probe_created(result, name, datum),
+                          on_error=self._on_create_error)
 
-            # Prüfen, ob Datum schon existiert
-            r_check = requests.get(api_url, headers=headers, timeout=10)
-            if r_check.status_code != 200:
-                self.status_label.text = f"Fehler beim Abruf bestehender Proben: {r_check.status_code}"
-                print("[ERROR] GET rows for create:", r_check.text)
-                return
+    @staticmethod
+    def _create_probe_request(name, datum):
+        """Duplikatprüfung + POST (läuft im Hintergrund). Liefert (Ergebnis, Status, Text)."""
+        # Prüfen, ob Datum schon existiert (serverseitig gefiltert, max. eine Zeile)
+        try:
+            existing = client.first_row(749, RowQuery().filter("Datum", "date_equal", datum).include("Datum"))
+        except BaserowAPIError as e:
+            return "check_failed", e.status_code, e.text
+        except Exception as e:
+            if not is_offline_error(e):
+                raise
+            existing = None  # offline: Prüfung erfolgt beim Nachspielen der Outbox
 
-            data = r_check.json().get("results", [])
-            exists = any(d.get("Datum") == datum for d in data)
-            if exists:
-                self.status_label.text = f"⚠ Probe für {datum} existiert bereits"
-                Popup(title="Info", content=Label(text=f"Probe für {datum} existiert bereits"), size_hint=(0.6, 0.4)).open()
-                return
+        if existing is not None:
+            return "exists", 200, ""
 
-            # Neue Probe anlegen
-            payload = {"Name": name, "Datum": datum}
-            r_post = requests.post(api_url, headers=headers, json=payload, timeout=10)
-            if r_post.status_code in (200, 201):
-                self.status_label.text = f"✅ Probe '{name}' erstellt für {datum}"
-                Popup(title="Erfolg", content=Label(text=f"Probe '{name}' erstellt ✅"), size_hint=(0.6, 0.4)).open()
-            else:
-                self.status_label.text = f"Fehler beim Erstellen: {r_post.status_code}"
-                Popup(title="Fehler", content=Label(text=f"Fehler: {r_post.text}"), size_hint=(0.6, 0.4)).open()
-                print("[ERROR] POST create row:", r_post.text)
+        # Neue Probe anlegen
+        payload = {"Name": name, "Datum": datum}
+        try:
+            outcome, detail = outbox.send("POST", 749, payload=payload,
+                                          skip_if_exists=("Datum", "date_equal", datum))
+        except BaserowAPIError as e:
+            return "create_failed", e.status_code, e.text
+        if outcome == "queued":
+            return "queued", 0, detail
+        return "created", 200, ""
+
+    def _on_probe_created(self, result, name, datum):
+        outcome, status_code, text = result
+        if outcome == "check_failed":
+            self.status_label.text = f"Fehler beim Abruf bestehender Proben: {status_code}"
+            print("[ERROR] GET rows for create:", text)
+        elif outcome == "exists":
+            self.status_label.text = f"⚠ Probe für {datum} existiert bereits"
+            Popup(title="Info", content=Label(text=f"Probe für {datum} existiert bereits"), size_hint=(0.6, 0.4)).open()
+        elif outcome == "queued":
+            self.status_label.text = f"Offline – Probe '{name}' vorgemerkt ({text} ausstehend)"
+        elif outcome == "created":
+            self.status_label.text = f"✅ Probe '{name}' erstellt für {datum}"
+            Popup(title="Erfolg", content=Label(text=f"Probe '{name}' erstellt ✅"), size_hint=(0.6, 0.4)).open()
+        else:
+            self.status_label.text = f"Fehler beim Erstellen: {status_code}"
+            Popup(title="Fehler", content=Label(text=f"Fehler: {text}"), size_hint=(0.6, 0.4)).open()
+            print("[ERROR] POST create row:", text)
 
-        except Exception as e:
-            self.status_label.text = f"Fehler: {e}"
-            Popup(title="Fehler", content=Label(text=f"{e}"), size_hint=(0.6, 0.4)).open()
-            print("create_probe ERROR:", e)
+    def _on_create_error(self, e):
+        self.status_label.text = f"Fehler: {e}"
+        Popup(title="Fehler", content=Label(text=f"{e}"), size_hint=(0.6, 0.4)).open()
+        print("create_probe ERROR:", e)
 
     def go_back(self, instance):
         self.manager.current = "main_menu"
 
+class BulkProbeScreen(Screen):
+    """Legt eine ganze Probenserie (z.B. jeden Dienstag) über wenige Batch-Requests an."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        layout = BoxLayout(orientation="vertical", padding=10, spacing=5)
+
+        self.status_label = Label(text="Probenserie anlegen", size_hint_y=None, height=30)
+        layout.add_widget(self.status_label)
+
+        layout.add_widget(Label(text="Erster Probenname"))
+        self.name_input = TextInput(multiline=False)
+        layout.add_widget(self.name_input)
+
+        layout.add_widget(Label(text="Von (Datum)"))
+        self.start_input = TextInput(text=date.today().isoformat(), multiline=False)
+        layout.add_widget(self.start_input)
+
+        layout.add_widget(Label(text="Bis (Datum)"))
+        self.end_input = TextInput(text=(date.today() + timedelta(weeks=12)).isoformat(), multiline=False)
+        layout.add_widget(self.end_input)
+
+        layout.add_widget(Label(text="Wochentag"))
+        self.weekday_spinner = Spinner(text="Dienstag", values=WEEKDAYS)
+        layout.add_widget(self.weekday_spinner)
+
+        create_btn = Button(text="Serie anlegen")
+        create_btn.bind(on_release=self.create_series)
+        layout.add_widget(create_btn)
+
+        back_btn = Button(text="Zurück")
+        back_btn.bind(on_release=self.go_back)
+        layout.add_widget(back_btn)
+
+        self.add_widget(layout)
+
+    def on_pre_enter(self):
+        if not client.load_config():
+            self.status_label.text = "Keine BASEROW_URL oder API_TOKEN vorhanden"
+            return
+        dispatcher.submit(self, client.first_row, 749, last_regular_probe_query(),
+                          on_success=self._on_last_probe,
+                          on_error=self._on_error)
+
+    def on_leave(self):
+        dispatcher.cancel(self)
+
+    def _on_last_probe(self, letzte):
+        if letzte is not None:
+            self.name_input.text = next_probe_name(letzte.get("Name", ""))
+            self.status_label.text = f"Letzte Probe: {letzte['Name']}"
+
+    def create_series(self, instance):
+        name = self.name_input.text.strip()
+        try:
+            start = date.fromisoformat(self.start_input.text.strip())
+            end = date.fromisoformat(self.end_input.text.strip())
+        except ValueError:
+            self.status_label.text = "Datum bitte als JJJJ-MM-TT angeben"
+            return
+        if not name or end < start:
+            self.status_label.text = "Name fehlt oder Enddatum liegt vor dem Startdatum"
+            return
+        if not client.load_config():
+            self.status_label.text = "Keine BASEROW_URL oder API_TOKEN vorhanden"
+            return
+
+        weekday = WEEKDAYS.index(self.weekday_spinner.text)
+        self.status_label.text = "Prüfe vorhandene Proben …"
+        dispatcher.submit(None, self._create_series_request, name, start, end, weekday,
+                          on_success=self._on_series_created,
+                          on_error=self._on_error)
+
+    def _create_series_request(self, first_name, start, end, weekday):
+        """Eine Duplikatprüfung für den ganzen Zeitraum, dann Batch-POSTs (Hintergrund)."""
+        query = (RowQuery()
+                 .filter("Datum", "date_after_or_equal", start.isoformat())
+                 .filter("Datum", "date_before_or_equal", end.isoformat())
+                 .include("Datum"))
+        # Nur der Tag zählt, auch wenn Datum ein Datum-mit-Uhrzeit-Feld ist
+        taken = {r["Datum"][:10] for r in client.fetch_all_rows(749, params=query.params()) if r.get("Datum")}
+        rows = generate_probe_series(first_name, start, end, weekday, skip_dates=taken)
+        created = client.batch_create_rows(749, rows, on_chunk=self._report_progress) if rows else []
+        # Gecachte Proben direkt mitführen (Statistiken, Stückindex), wie beim Einzel-POST
+        if created and row_cache.is_cached(749):
+            row_cache.upsert_rows(749, created)
+        skipped = sum(1 for d in taken if date.fromisoformat(d).weekday() == weekday)
+        return created, skipped
+
+    def _report_progress(self, done, total):
+        Clock.schedule_once(lambda dt: setattr(self.status_label, "text", f"{done}/{total} Proben angelegt …"), 0)
+
+    def _on_series_created(self, result):
+        created, skipped = result
+        if not created:
+            self.status_label.text = f"Keine neuen Proben – {skipped} Termine existieren bereits"
+            return
+        msg = f"✅ {len(created)} Proben angelegt ({created[0].get('Name')} … {created[-1].get('Name')})"
+        if skipped:
+            msg += f", {skipped} übersprungen"
+        self.status_label.text = msg
+        Popup(title="Erfolg", content=Label(text=msg), size_hint=(0.8, 0.4)).open()
+
+    def _on_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler: {e.status_code}"
+            print("[ERROR] Probenserie:", e.text)
+            return
+        self.status_label.text = f"Fehler: {e}"
+        print("create_series ERROR:", e)
+
+    def go_back(self, instance):
+        self.manager.current = "add_probe"
+
+# Proben pro Seite in der Auswahlliste; weitere Seiten beim Scrollen
+PROBE_PAGE_SIZE = 50
+# Nachladen, sobald das Listenende näher als dieser Anteil der Gesamthöhe ist
+PROBE_SCROLL_THRESHOLD = 0.1
+
+
+def probe_list_query():
+    """Neueste Proben zuerst, nur die Felder der Auswahlliste."""
+    return RowQuery().order_by("-Datum").include("Name", "Datum", CACHE_MODIFIED_FIELD)
+
+def fetch_probe_changes(since):
+    """Seit `since` geänderte Proben plus aktuelle Gesamtzahl (läuft im Hintergrund)."""
+    changed = client.fetch_all_rows(
+        749, params=probe_list_query().filter(CACHE_MODIFIED_FIELD, "date_after_or_equal", since[:10]).params())
+    count = client.query_rows(749, RowQuery().include("id").size(1)).get("count")
+    return changed, count
+
+
+class ProbeListRow(RecycleDataViewBehavior, Button):
+    """Wiederverwendete Zeile (Datum – Name) einer ProbeList."""
+    SELECTED_COLOR = get_color_from_hex("#3399FF")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.index = None
+        self.rv = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv
+        self.index = index
+        self.text = data["text"]
+        self.background_color = self.SELECTED_COLOR if data["selected"] else (1, 1, 1, 1)
+
+    def on_release(self):
+        if self.rv is not None and self.index is not None:
+            self.rv.select(self.index)
+
+
+class ProbeList(RecycleView):
+    """
+    Probenliste (neueste zuerst) auf Basis einer RecycleView. Änderungen werden
+    zeilenweise auf die Datenliste angewendet (insert/pop/Zuweisung), sodass nur
+    betroffene Einträge neu gezeichnet werden. Die Position einer Probe ergibt
+    sich per Bisect aus der sortierten Schlüsselliste (Datum, ID).
+    """
+    ROW_HEIGHT = 44
+    SPACING = 5
+
+    def __init__(self, on_select=None, **kwargs):
+        super().__init__(**kwargs)
+        layout = RecycleBoxLayout(orientation="vertical", spacing=self.SPACING, size_hint_y=None,
+                                  default_size=(None, self.ROW_HEIGHT), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter("height"))
+        layout.bind(height=self._keep_offset)
+        self.add_widget(layout)
+        self._content_height = 0
+        # viewclass erst nach dem LayoutManager setzen, sonst wird sie nicht übernommen
+        self.viewclass = ProbeListRow
+        self.on_select = on_select
+        self.selected_id = None
+        self._keys = []    # (Datum, ID) aufsteigend; data ist absteigend sortiert
+        self._key_of = {}  # Proben-ID -> (Datum, ID)
+
+    @staticmethod
+    def _key(probe):
+        return ((probe.get("Datum") or "")[:10], probe["id"])
+
+    def _position(self, key):
+        """Index in data (absteigend) für einen Schlüssel aus _keys."""
+        return len(self._keys) - 1 - bisect_left(self._keys, key)
+
+    def _item(self, probe):
+        return {"pid": probe["id"],
+                "text": f"{probe.get('Datum') or 'unbekannt'} – {probe.get('Name') or 'Unbenannt'}",
+                "selected": probe["id"] == self.selected_id}
+
+    def clear(self):
+        self._keys = []
+        self._key_of = {}
+        self.selected_id = None
+        self.data = []
+
+    def append_page(self, rows):
+        """
+        Nächste Seite (älter als alles Geladene) per extend anhängen;
+        sonst zeilenweise einsortieren. Liefert die Anzahl neuer Proben.
+        """
+        rows = [p for p in rows if p["id"] not in self._key_of]
+        keys = [self._key(p) for p in rows]
+        if not keys or (self._keys and max(keys) >= self._keys[0]):
+            return self.apply(rows)
+        order = sorted(range(len(rows)), key=keys.__getitem__, reverse=True)
+        self._keys[:0] = sorted(keys)
+        self._key_of.update((p["id"], k) for p, k in zip(rows, keys))
+        self.data.extend(self._item(rows[i]) for i in order)
+        return len(rows)
+
+    def apply(self, rows):
+        """Neue oder geänderte Proben einsortieren. Liefert die Anzahl neuer Proben."""
+        added = 0
+        for probe in rows:
+            key = self._key(probe)
+            item = self._item(probe)
+            old = self._key_of.get(probe["id"])
+            if old == key:
+                index = self._position(key)
+                if self.data[index] != item:
+                    self.data[index] = item
+                continue
+            if old is None:
+                added += 1
+            else:
+                self._remove_key(old)  # Datum geändert -> an neuer Position einsortieren
+            insort(self._keys, key)
+            self._key_of[probe["id"]] = key
+            self.data.insert(self._position(key), item)
+        return added
+
+    def remove(self, row_ids):
+        """Proben entfernen; unbekannte IDs werden ignoriert. Liefert die Anzahl."""
+        removed = 0
+        for pid in row_ids:
+            key = self._key_of.pop(pid, None)
+            if key is None:
+                continue
+            self._remove_key(key)
+            if pid == self.selected_id:
+                self.selected_id = None
+            removed += 1
+        return removed
+
+    def _remove_key(self, key):
+        index = self._position(key)
+        del self._keys[bisect_left(self._keys, key)]
+        self.data.pop(index)
+
+    def select(self, index):
+        item = self.data[index]
+        if self.selected_id in self._key_of and self.selected_id != item["pid"]:
+            previous = self._position(self._key_of[self.selected_id])
+            self.data[previous] = dict(self.data[previous], selected=False)
+        self.selected_id = item["pid"]
+        if not item["selected"]:
+            self.data[index] = dict(item, selected=True)
+        if self.on_select is not None:
+            self.on_select(item["pid"], item["text"])
+
+    def _keep_offset(self, layout, height):
+        """Beim Anhängen die Scrollposition (Abstand zum Listenanfang) halten."""
+        old, self._content_height = self._content_height, height
+        if old > self.height and height > self.height:
+            offset = (1 - self.scroll_y) * (old - self.height)
+            self.scroll_y = max(0, 1 - offset / (height - self.height))
+
+    def fills_view(self):
+        return len(self._keys) * (self.ROW_HEIGHT + self.SPACING) > self.height
+
+    def near_end(self):
+        """True, wenn das Listenende sichtbar oder fast erreicht ist."""
+        return not self.fills_view() or self.scroll_y <= PROBE_SCROLL_THRESHOLD
+
+
 class EditProbeScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -395,98 +1911,560 @@ class EditProbeScreen(Screen):
         self.status_label = Label(text="Probe auswählen", size_hint_y=None, height=30)
         layout.add_widget(self.status_label)
 
-        # ScrollView für Probenliste
-        self.scroll = ScrollView(size_hint=(1, 0.8))
-        self.grid = GridLayout(cols=1, spacing=5, size_hint_y=None)
-        self.grid.bind(minimum_height=self.grid.setter("height"))
-        self.scroll.add_widget(self.grid)
-        layout.add_widget(self.scroll)
+        # Probenliste: Seiten werden beim Scrollen nachgeladen
+        self.probe_list = ProbeList(on_select=self.select_in_list, size_hint=(1, 0.8))
+        self.probe_list.bind(scroll_y=self._on_scroll)
+        layout.add_widget(self.probe_list)
+
+        # Buttons unten
+        select_btn = Button(text="Auswählen", size_hint_y=None, height=40)
+        select_btn.bind(on_release=self.select_probe)
+        layout.add_widget(select_btn)
+
+        back_btn = Button(text="Zurück", size_hint_y=None, height=40)
+        back_btn.bind(on_release=self.go_back)
+        layout.add_widget(back_btn)
+
+        self.add_widget(layout)
+
+        self.selected_probe = None
+        self._proben_loaded = False
+        self._loading = False
+        self._exhausted = False  # alle Seiten geladen
+        self._oldest = None      # ältestes geladenes Datum (Grenze für die nächste Seite)
+        self._modified = None    # jüngster bekannter Änderungszeitpunkt (für refresh)
+        self._total = 0          # Anzahl Proben auf dem Server
+        self._refresh_perf = None
+        realtime.add_listener(self._on_realtime)
+
+    def on_pre_enter(self):
+        # Erstes Betreten bzw. abgebrochener Ladevorgang: neu laden, sonst nur Änderungen holen
+        if not self._proben_loaded:
+            self.load_proben()
+        elif 749 not in row_cache.live_tables:
+            self.refresh()
+
+    def on_leave(self):
+        dispatcher.cancel(self)
+        self._loading = False
+
+    def load_proben(self):
+        """Lädt die erste Seite neu; weitere Seiten folgen beim Scrollen (load_more)."""
+        if not client.load_config():
+            self.status_label.text = "Fehlende URL oder Token"
+            return
+
+        self.status_label.text = "Lade Proben …"
+        dispatcher.cancel(self)
+        self.probe_list.clear()
+        self.selected_probe = None
+        self._proben_loaded = False
+        self._exhausted = False
+        self._oldest = self._modified = None
+        self._loading = True
+        self._perf = perf.begin("screen", "edit_probe")
+        dispatcher.submit(self, client.query_rows, 749, probe_list_query().size(PROBE_PAGE_SIZE),
+                          on_success=self._on_first_page,
+                          on_error=self._on_load_error)
+
+    def load_more(self):
+        """Nächste Seite: Proben bis zum ältesten geladenen Datum (Duplikate fallen weg)."""
+        if self._loading or self._exhausted or not self._proben_loaded:
+            return
+        self._loading = True
+        self.status_label.text = "Lade weitere Proben …"
+        query = probe_list_query().size(PROBE_PAGE_SIZE)
+        if self._oldest:
+            query.filter("Datum", "date_before_or_equal", self._oldest)
+        dispatcher.submit(self, client.query_rows, 749, query,
+                          on_success=self._on_proben_page,
+                          on_error=self._on_load_error)
+
+    def refresh(self):
+        """Nur seit dem letzten Laden geänderte Proben holen (ohne Realtime-Abo)."""
+        if self._loading:
+            return
+        if not self._modified:
+            # Ohne "Zuletzt geändert" lässt sich kein Delta bilden -> erste Seite neu laden
+            self.load_proben()
+            return
+        self._loading = True
+        self._refresh_perf = perf.begin("screen", "edit_probe_refresh")
+        dispatcher.submit(self, fetch_probe_changes, self._modified,
+                          on_success=self._on_changes,
+                          on_error=self._on_load_error)
+
+    def _on_scroll(self, instance, value):
+        if self.probe_list.near_end():
+            self.load_more()
+
+    def _on_first_page(self, body):
+        self._total = body.get("count", 0)
+        self._proben_loaded = True
+        self._on_proben_page(body)
+        perf.end(self._perf, rows=len(self.probe_list.data))
+
+    def _on_proben_page(self, body):
+        rows = body.get("results", [])
+        with perf.measure("widgets", "proben_page", rows=len(rows)):
+            added = self.probe_list.append_page(rows)
+        self._loading = False
+        self._track(rows)
+        dates = [p["Datum"][:10] for p in rows if p.get("Datum")]
+        if dates:
+            self._oldest = min(dates + ([self._oldest] if self._oldest else []))
+        # Letzte Seite, oder keine neue Probe mehr (alle Treffer schon geladen)
+        if not body.get("next") or not added:
+            self._exhausted = True
+        self._update_status()
+        # Füllt die Liste den sichtbaren Bereich nicht, direkt weiterladen
+        if not self.probe_list.fills_view():
+            Clock.schedule_once(lambda dt: self.load_more(), 0)
+
+    def _on_changes(self, result):
+        changed, count = result
+        self._loading = False
+        self._total += self._apply_rows(changed)
+        self._track(changed)
+        reload = count != self._total
+        perf.end(self._refresh_perf, rows=len(changed), reload=reload)
+        self._refresh_perf = None
+        if reload:
+            # Gelöscht oder außerhalb des geladenen Bereichs angelegt -> neu laden
+            self.load_proben()
+            return
+        self._update_status()
+
+    def _in_window(self, probe):
+        """Liegt die Probe im bereits geladenen Bereich? Ältere kommen mit späteren Seiten."""
+        datum = (probe.get("Datum") or "")[:10]
+        return self._exhausted or not datum or not self._oldest or datum >= self._oldest
+
+    def _apply_rows(self, rows):
+        """Änderungen übernehmen; aus dem geladenen Bereich gerutschte Proben entfernen."""
+        self.probe_list.remove([p["id"] for p in rows if not self._in_window(p)])
+        added = self.probe_list.apply([p for p in rows if self._in_window(p)])
+        if self.probe_list.selected_id is None:
+            self.selected_probe = None
+        return added
+
+    def _track(self, rows):
+        modified = [p[CACHE_MODIFIED_FIELD] for p in rows if p.get(CACHE_MODIFIED_FIELD)]
+        if modified:
+            self._modified = max(modified + ([self._modified] if self._modified else []))
+
+    def _update_status(self):
+        self.status_label.text = f"{len(self.probe_list.data)} von {self._total} Proben geladen"
+
+    def _on_realtime(self, table_id, kind, rows, row_ids):
+        """Realtime-Ereignisse direkt auf die Liste anwenden, ohne neu zu laden."""
+        if table_id != 749 or not self._proben_loaded:
+            return
+        if kind == "deleted":
+            self.probe_list.remove(row_ids)
+            if self.probe_list.selected_id is None:
+                self.selected_probe = None
+            self._total -= len(row_ids)
+        else:
+            self._apply_rows(rows)
+            if kind == "created":
+                self._total += len(rows)
+            self._track(rows)
+        self._update_status()
+
+    def _on_load_error(self, e):
+        self._loading = False
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler: {e.status_code}"
+            print("[ERROR] load_proben:", e.text)
+            return
+        self.status_label.text = f"Fehler: {e}"
+        print("load_proben ERROR:", e)
+
+    def select_in_list(self, probe_id, text):
+        self.selected_probe = probe_id
+        self.status_label.text = f"Ausgewählt: {text}"
+
+    def select_probe(self, instance):
+        if not self.selected_probe:
+            self.status_label.text = "Bitte zuerst eine Probe auswählen"
+            return
 
-        # Buttons unten
-        select_btn = Button(text="Auswählen", size_hint_y=None, height=40)
-        select_btn.bind(on_release=self.select_probe)
-        layout.add_widget(select_btn)
+        # Übergabe der ausgewählten Probe-ID (Screen wird bei Bedarf erst jetzt gebaut)
+        target = get_or_create_screen(self.manager, "edit_selected_probe")
+        target.load_probe(self.selected_probe)
 
-        back_btn = Button(text="Zurück", size_hint_y=None, height=40)
-        back_btn.bind(on_release=self.go_back)
-        layout.add_widget(back_btn)
+        self.manager.current = "edit_selected_probe"
 
-        self.add_widget(layout)
-        Clock.schedule_once(lambda dt: self.load_proben(), 0.1)
+    def go_back(self, instance):
+        self.manager.current = "main_menu"
 
-        self.selected_probe = None
 
-    def load_proben(self):
-        """Lädt alle Proben in eine Scrollliste."""
-        try:
-            load_local_env()
-            base_url = os.getenv("BASEROW_URL")
-            api_token = os.getenv("API_TOKEN")
 
-            if not base_url or not api_token:
-                self.status_label.text = "Fehlende URL oder Token"
-                return
 
-            headers = {"Authorization": f"Token {api_token}"}
-            api_url = f"{base_url}database/rows/table/749/?user_field_names=true"
-            r = requests.get(api_url, headers=headers, timeout=10)
+# -----------------------
+# Suchindex (Autovervollständigung)
+# -----------------------
+_UMLAUT_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
 
-            if r.status_code != 200:
-                self.status_label.text = f"Fehler: {r.status_code}"
-                print("[ERROR] load_proben:", r.text)
-                return
+def _strip_accents(text):
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
 
-            data = r.json().get("results", [])
-            data.sort(key=lambda x: x.get("Datum", ""), reverse=True)
+def normalize_search_text(text):
+    """Suchschlüssel: kleingeschrieben, ß->ss, Akzente/Umlaute ohne Zeichen (ä->a)."""
+    return _strip_accents(str(text).casefold())
 
-            self.grid.clear_widgets()
-            for probe in data:
-                pid = probe.get("id")
-                name = probe.get("Name", "Unbenannt")
-                datum = probe.get("Datum", "unbekannt")
-                btn = Button(text=f"{datum} – {name}", size_hint_y=None, height=44)
-                btn.bind(on_release=lambda inst, pid=pid: self.select_in_list(pid, inst))
-                self.grid.add_widget(btn)
+def search_keys(text):
+    """Beide Faltungen eines Textes, damit "muller", "mueller" und "müller" Müller finden."""
+    folded = str(text).casefold()
+    return {_strip_accents(folded), _strip_accents(folded.translate(_UMLAUT_FOLD))}
 
-            self.status_label.text = f"{len(data)} Proben geladen"
 
-        except Exception as e:
-            self.status_label.text = f"Fehler: {e}"
-            print("load_proben ERROR:", e)
+class SearchIndex:
+    """
+    Vorberechneter Index über mehrere Felder. Rangfolge: exakter Feldinhalt,
+    Feldanfang, Wortanfang, Teilstring – jeweils nach Feldgewicht. Die ersten
+    drei Stufen sind sortierte Listen (Bisect, Abbruch sobald limit erreicht),
+    Teilstrings ab drei Zeichen laufen über einen Trigramm-Index.
+    """
+    def __init__(self, field_weights):
+        self.field_weights = dict(field_weights)  # Feld -> Gewicht, z.B. {"Name": 3}
+        self._weights = sorted(set(self.field_weights.values()), reverse=True)
+        self._keys = {}                             # entry_id -> [(Gewicht, Schlüssel), ...]
+        self._trigrams = {}                         # Trigramm -> set(entry_id)
+        self._starts = {w: [] for w in self._weights}  # (Schlüssel, entry_id), sortiert
+        self._words = {w: [] for w in self._weights}   # (Rest ab Wortanfang, entry_id), sortiert
+
+    def __len__(self):
+        return len(self._keys)
+
+    def build(self, entries):
+        """entries: iterierbar aus (entry_id, {Feld: Text}) oder (entry_id, Datensatz mit Attributen)."""
+        self._keys, self._trigrams = {}, {}
+        self._starts = {w: [] for w in self._weights}
+        self._words = {w: [] for w in self._weights}
+        for entry_id, fields in entries:
+            for weight, lst, item in self._index_entry(entry_id, fields):
+                lst.append(item)
+        for lst in list(self._starts.values()) + list(self._words.values()):
+            lst.sort()
+        return self
+
+    def add(self, entry_id, fields):
+        for weight, lst, item in self._index_entry(entry_id, fields):
+            lst.insert(bisect_left(lst, item), item)
+
+    def _index_entry(self, entry_id, fields):
+        keys = []
+        for field, weight in self.field_weights.items():
+            value = fields.get(field) if isinstance(fields, dict) else getattr(fields, field, None)
+            if not value:
+                continue
+            for key in search_keys(value):
+                keys.append((weight, key))
+                yield weight, self._starts[weight], (key, entry_id)
+                for i, ch in enumerate(key):
+                    if i and key[i - 1] == " " and ch != " ":
+                        yield weight, self._words[weight], (key[i:], entry_id)
+                for i in range(len(key) - 2):
+                    self._trigrams.setdefault(key[i:i + 3], set()).add(entry_id)
+        self._keys[entry_id] = keys
+
+    @staticmethod
+    def _prefix_range(lst, query, exact=False):
+        # Sortierte Liste: alle Treffer liegen direkt hintereinander, exakte zuerst
+        i = bisect_left(lst, (query,))
+        while i < len(lst) and (lst[i][0] == query if exact else lst[i][0].startswith(query)):
+            yield lst[i]
+            i += 1
+
+    def _score(self, entry_id, query):
+        """(Trefferart, Gewicht) für einen Eintrag oder None – 3 exakt, 2 Anfang, 1 Wort, 0 irgendwo."""
+        best = None
+        for weight, key in self._keys.get(entry_id, ()):
+            pos = key.find(query)
+            if pos < 0:
+                continue
+            kind = 3 if key == query else 2 if pos == 0 else 1 if key[pos - 1] == " " else 0
+            if best is None or (kind, weight) > best:
+                best = (kind, weight)
+        return best
+
+    def candidates(self, query):
+        """
+        Obermenge der Treffer aus dem Trigramm-Index (ab drei Zeichen, sonst None).
+        Dient als Ausgangsmenge zum Eingrenzen, wenn weitergetippt wird.
+        """
+        query = normalize_search_text(query).strip()
+        if len(query) < 3:
+            return None
+        grams = [query[i:i + 3] for i in range(len(query) - 2)]
+        postings = sorted((self._trigrams.get(g, set()) for g in grams), key=len)
+        return set.intersection(*postings)
+
+    def search(self, query, limit=10, within=None):
+        """
+        Entry-IDs zu query, bestes Ergebnis zuerst.
+        within: bereits bekannte Kandidatenmenge (wird direkt gerankt).
+        """
+        query = normalize_search_text(query).strip()
+        if not query:
+            return []
+        if within is not None:
+            ranked = [(score, e) for e in within for score in [self._score(e, query)] if score]
+            ranked.sort(key=lambda item: item[0], reverse=True)
+            return [e for _, e in (ranked[:limit] if limit else ranked)]
+
+        results, seen = [], set()
+
+        def collect(entry_ids):
+            for entry_id in entry_ids:
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    results.append(entry_id)
+                    if limit and len(results) >= limit:
+                        return True
+            return False
 
-    def select_in_list(self, probe_id, instance):
-        self.selected_probe = probe_id
-        self.status_label.text = f"Ausgewählt: {instance.text}"
+        # 1. exakter Feldinhalt, 2. Feldanfang, 3. Wortanfang – jeweils schwerstes Feld zuerst
+        for w in self._weights:
+            if collect(e for _, e in self._prefix_range(self._starts[w], query, exact=True)):
+                return results
+        for w in self._weights:
+            if collect(e for _, e in self._prefix_range(self._starts[w], query)):
+                return results
+        for w in self._weights:
+            if collect(e for _, e in self._prefix_range(self._words[w], query)):
+                return results
+        # 4. Teilstring irgendwo im Wort (Trigramme, erst ab drei Zeichen sinnvoll)
+        if len(query) >= 3:
+            scored = [(score, e) for e in self.candidates(query) - seen
+                      for score in [self._score(e, query)] if score]
+            scored.sort(key=lambda item: item[0], reverse=True)
+            collect(e for _, e in scored)
+        return results
+
+
+class LayeredSearchIndex:
+    """
+    Geteilter (unveränderlicher) Basisindex plus kleiner eigener Index für lokal
+    ergänzte Einträge. Treffer aus der Ergänzung kommen zuerst.
+    """
+    def __init__(self, base, overlay):
+        self.base = base
+        self.overlay = overlay
 
-    def select_probe(self, instance):
-        if not self.selected_probe:
-            self.status_label.text = "Bitte zuerst eine Probe auswählen"
-            return
+    def __len__(self):
+        return len(self.base) + len(self.overlay)
 
-        # Screen hinzufügen falls noch nicht vorhanden
-        if "edit_selected_probe" not in self.manager.screen_names:
-            self.manager.add_widget(EditSelectedProbeScreen(name="edit_selected_probe"))
+    def add(self, entry_id, fields):
+        self.overlay.add(entry_id, fields)
 
-        # Übergabe der ausgewählten Probe-ID
-        target = self.manager.get_screen("edit_selected_probe")
-        target.load_probe(self.selected_probe)
+    def candidates(self, query):
+        base = self.base.candidates(query)
+        return None if base is None else base | self.overlay.candidates(query)
 
-        self.manager.current = "edit_selected_probe"
+    def search(self, query, limit=10, within=None):
+        if within is not None:
+            local = {e for e in within if e in self.overlay._keys}
+            results = (self.overlay.search(query, limit, within=local)
+                       + self.base.search(query, limit, within=within - local))
+        else:
+            results = self.overlay.search(query, limit) + self.base.search(query, limit)
+        return results[:limit] if limit else results
 
-    def go_back(self, instance):
-        self.manager.current = "main_menu"
 
+class IncrementalSearch:
+    """
+    Entprellte Suche für Eingabefelder: läuft erst DELAY Sekunden nach dem
+    letzten Tastendruck. Wird die Eingabe nur verlängert, wird die vorige
+    (kleine) Treffermenge eingegrenzt statt erneut den Index zu befragen.
+    """
+    DELAY = 0.12
+    NARROW_LIMIT = 200
+
+    def __init__(self, on_results, limit=10):
+        self.on_results = on_results
+        self.limit = limit
+        self.index = None
+        self._text = ""
+        self._last_query = None
+        self._last_matches = None
+        self._trigger = Clock.create_trigger(self._run, self.DELAY)
+
+    def set_index(self, index):
+        self.index = index
+        self._last_query = self._last_matches = None
+
+    def query(self, text):
+        self._text = text
+        self._trigger.cancel()
+        if not text.strip():
+            self._last_query = self._last_matches = None
+            self.on_results([])
+            return
+        self._trigger()
+
+    def cancel(self):
+        self._trigger.cancel()
 
+    def _run(self, dt):
+        query = normalize_search_text(self._text).strip()
+        if not query or self.index is None:
+            self.on_results([])
+            return
+        if (self._last_matches is not None and self._last_query
+                and query.startswith(self._last_query)):
+            ranked = self.index.search(query, limit=None, within=self._last_matches)
+            self._last_matches = set(ranked)
+        else:
+            ranked = self.index.search(query, limit=self.limit)
+            candidates = self.index.candidates(query)
+            small = candidates is not None and len(candidates) <= self.NARROW_LIMIT
+            self._last_matches = candidates if small else None
+        self._last_query = query
+        self.on_results(ranked[:self.limit])
+
+
+class SuggestionPool:
+    """Fester Satz Vorschlags-Buttons, die wiederverwendet statt neu erzeugt werden."""
+    def __init__(self, box, on_select, size=10, **button_kwargs):
+        self.box = box
+        self.on_select = on_select
+        self.buttons = []
+        for _ in range(size):
+            btn = Button(size_hint_y=None, height=30, **button_kwargs)
+            btn.value = None
+            btn.bind(on_release=lambda b: self.on_select(b.value))
+            self.buttons.append(btn)
+
+    def show(self, items):
+        """items: Liste aus (Anzeigetext, Wert); überzählige Buttons werden ausgeblendet."""
+        for i, btn in enumerate(self.buttons):
+            if i < len(items):
+                btn.text, btn.value = items[i]
+                if btn.parent is None:
+                    self.box.add_widget(btn)
+            elif btn.parent is not None:
+                self.box.remove_widget(btn)
+
+    def clear(self):
+        self.show([])
 
 
 # -----------------------
 # PieceSelectorAddOnly
 # -----------------------
+# Feldgewichte für die Stücksuche (Attribute von PieceRecord)
+PIECE_SEARCH_FIELDS = {"name": 3, "heft": 2, "komponist": 1}
+
+
+class PieceRegistry:
+    """
+    Stücke nach ID und normalisiertem Namen (beides O(1)). Neu angelegte
+    Stücke bekommen sofort eine temporäre negative ID, die nach dem Anlegen
+    in Baserow per reconcile() auf die echte ID umgestellt wird.
+    Mit base liegt die Registry als Ergänzung über einer geteilten Registry,
+    die selbst nicht verändert wird (siehe load_piece_catalog).
+    """
+    def __init__(self, pieces=(), base=None):
+        self.base = base
+        self._by_id = {}
+        self._by_name = {}
+        self._order = {}    # ID -> Position (Anzeige in Tabellenreihenfolge)
+        self._aliases = {}  # temporäre ID -> echte ID
+        self._next_temp = -1
+        for piece in pieces:
+            self.add(piece)
+
+    def add(self, piece):
+        self._by_id[piece.id] = piece
+        self._by_name.setdefault(normalize_search_text(piece.name).strip(), piece)
+        self._order[piece.id] = len(self._order)
+        return piece
+
+    def get(self, pid):
+        piece = self._by_id.get(self._aliases.get(pid, pid))
+        if piece is None and self.base is not None:
+            return self.base.get(pid)
+        return piece
+
+    def find_by_name(self, name):
+        piece = self._by_name.get(normalize_search_text(name).strip())
+        if piece is None and self.base is not None:
+            return self.base.find_by_name(name)
+        return piece
+
+    def add_local(self, name):
+        """Neues Stück mit temporärer ID, bis Baserow die echte vergeben hat."""
+        piece = self.add(PieceRecord.local(self._next_temp, name))
+        self._next_temp -= 1
+        return piece
+
+    def reconcile(self, temp_id, row):
+        """Temporäre ID durch die von Baserow vergebene ersetzen; liefert das Stück."""
+        piece = self._by_id.pop(temp_id)
+        piece.id = row["id"]  # lokaler Datensatz, nicht Teil des RecordStore
+        self._by_id[row["id"]] = piece
+        self._order[row["id"]] = self._order.pop(temp_id)
+        self._aliases[temp_id] = row["id"]
+        return piece
+
+    def _position(self, pid):
+        """Sortierschlüssel: Stücke der Basis in deren Reihenfolge, eigene danach."""
+        if self.base is not None:
+            position = self.base._position(pid)
+            if position is not None:
+                return (0,) + position
+        return (1, self._order[pid]) if pid in self._order else None
+
+    def sorted_ids(self, ids):
+        keyed = [(self._position(i), i) for i in ids]
+        return [i for key, i in sorted(item for item in keyed if item[0] is not None)]
+
+
+# (Datensatzliste aus dem RecordStore, Registry und Suchindex darüber)
+_piece_catalog = (None, None, None)
+
+def load_piece_catalog():
+    """
+    Registry und Suchindex über alle Stücke (läuft im Hintergrund). Gebaut wird
+    nur, wenn der RecordStore eine neue Liste liefert; beide werden von allen
+    PieceSelectorAddOnly geteilt und nicht verändert.
+    """
+    global _piece_catalog
+    pieces = records.get(747)
+    source, registry, index = _piece_catalog
+    if source is not pieces:
+        registry = PieceRegistry(pieces)
+        index = SearchIndex(PIECE_SEARCH_FIELDS).build((p.id, p) for p in pieces)
+        _piece_catalog = (pieces, registry, index)
+    return registry, index
+
+
+def create_piece(name):
+    """
+    Legt ein Stück (nur Name) in Tabelle 747 an (läuft im Hintergrund).
+    Liefert die Zeile mit echter ID oder None, wenn es offline vorgemerkt wurde.
+    """
+    outcome, row = outbox.send("POST", 747, payload={"Name": name}, skip_if_exists=("Name", "equal", name))
+    if outcome == "queued":
+        return None
+    # Existierte es bereits, liefert die Outbox keine Zeile -> vorhandene nachschlagen
+    return row or client.first_row(
+        747, RowQuery().filter("Name", "equal", name).include(*CACHE_FIELDS[747]))
+
+
 class PieceSelectorAddOnly(BoxLayout):
-    def __init__(self, all_pieces, selected_set=None, **kwargs):
+    def __init__(self, catalog, selected_set=None, **kwargs):
         super().__init__(orientation="vertical", spacing=5, size_hint_y=None, **kwargs)
         self.bind(minimum_height=self.setter("height"))
-        self.all_pieces = all_pieces or []
+        # Geteilter Katalog (load_piece_catalog), eigene neue Stücke nur in der Ergänzung
+        base_registry, base_index = catalog
+        self.registry = PieceRegistry(base=base_registry)
+        self.pending_creates = set()  # temporäre IDs, deren Anlage noch läuft
+        self.on_created_callback = None  # nach jeder abgeschlossenen Anlage, erhält den Selector
+        self.search_index = LayeredSearchIndex(base_index, SearchIndex(PIECE_SEARCH_FIELDS))
         self.selected_set = selected_set or set()
         self.on_add_callback = None  # Wird aufgerufen, wenn ein Stück hinzugefügt wurde
 
@@ -503,6 +2481,10 @@ class PieceSelectorAddOnly(BoxLayout):
         # Vorschlagsbox für Autovervollständigung
         self.suggestion_box = BoxLayout(orientation="vertical", spacing=3, size_hint_y=None)
         self.suggestion_box.bind(minimum_height=self.suggestion_box.setter("height"))
+        self.suggestions = SuggestionPool(self.suggestion_box, self._add_piece_by_id,
+                                          halign="left", valign="middle")
+        self.search = IncrementalSearch(self._show_matches)
+        self.search.set_index(self.search_index)
         self.text_input.bind(text=self.on_text)
         self.add_widget(self.suggestion_box)
 
@@ -520,9 +2502,9 @@ class PieceSelectorAddOnly(BoxLayout):
     # --------------------------------------------
     def _format_piece_text(self, piece):
         """Formatiert Stückname - Heft/Noten - S. #"""
-        parts = [piece.get("value", "Unbenannt")]
-        heft = piece.get("Heft/Noten")
-        seite = piece.get("Seite")
+        parts = [piece.name]
+        heft = piece.heft
+        seite = piece.seite
         if heft:
             parts.append(str(heft))
         if seite:
@@ -531,31 +2513,17 @@ class PieceSelectorAddOnly(BoxLayout):
 
     # --------------------------------------------
     def on_text(self, instance, value):
-        """Zeigt Vorschläge basierend auf der Eingabe."""
-        self.suggestion_box.clear_widgets()
-        query = value.strip().lower()
-        if not query:
-            return
-        matches = [p for p in self.all_pieces if query in p["value"].lower()]
-        print(f"[DEBUG] found {len(matches)} matching pieces for '{value}'")
+        """Zeigt Vorschläge basierend auf der Eingabe (entprellt)."""
+        self.search.query(value)
 
-        for p in matches[:10]:
-            btn = Button(
-                text=self._format_piece_text(p),
-                size_hint_y=None,
-                height=30,
-                halign="left",
-                valign="middle"
-            )
-            btn.bind(on_release=lambda b, pid=p["id"]: self._add_piece_by_id(pid))
-            self.suggestion_box.add_widget(btn)
+    def _show_matches(self, pids):
+        self.suggestions.show([(self._format_piece_text(self.registry.get(pid)), pid) for pid in pids])
 
     # --------------------------------------------
     def _add_piece_by_id(self, pid):
         """Wird aufgerufen, wenn ein Vorschlag ausgewählt wird."""
-        self.selected_set.add(pid)
+        self.selected_set.add(self.registry.get(pid).id)
         self.text_input.text = ""
-        self.suggestion_box.clear_widgets()
         self._refresh_selected_display()
         if callable(self.on_add_callback):
             self.on_add_callback()
@@ -566,24 +2534,50 @@ class PieceSelectorAddOnly(BoxLayout):
         name = self.text_input.text.strip()
         if not name:
             return
-        existing = next((p for p in self.all_pieces if p["value"].strip().lower() == name.lower()), None)
+        existing = self.registry.find_by_name(name)
         if existing:
-            pid = existing["id"]
+            pid = existing.id
         else:
-            pid = max([p["id"] for p in self.all_pieces], default=0) + 1
-            self.all_pieces.append({"id": pid, "value": name})
+            # Sofort mit temporärer ID auswählen, die echte ID liefert Baserow im Hintergrund
+            piece = self.registry.add_local(name)
+            pid = piece.id
+            self.search_index.add(pid, piece)
+            self.search.set_index(self.search_index)
+            self.pending_creates.add(pid)
+            dispatcher.submit(None, create_piece, name,
+                              on_success=lambda row, pid=pid: self._on_piece_created(pid, row),
+                              on_error=lambda e, pid=pid: self._on_piece_created(pid, None, e))
         self.selected_set.add(pid)
         self.text_input.text = ""
-        self.suggestion_box.clear_widgets()
         self._refresh_selected_display()
         if callable(self.on_add_callback):
             self.on_add_callback()
 
+    # --------------------------------------------
+    def _on_piece_created(self, temp_id, row, error=None):
+        self.pending_creates.discard(temp_id)
+        if row is not None:
+            self.registry.reconcile(temp_id, row)
+            if temp_id in self.selected_set:
+                self.selected_set.discard(temp_id)
+                self.selected_set.add(row["id"])
+            print(f"[INFO] Stück '{row.get('Name')}' angelegt (ID {row['id']})")
+        elif error is not None:
+            print("[ERROR] Stück konnte nicht angelegt werden:", error)
+        else:
+            print("[INFO] Stück offline vorgemerkt, ID folgt nach dem Sync")
+        if callable(self.on_created_callback):
+            self.on_created_callback(self)
+
+    def unresolved_ids(self):
+        """Ausgewählte Stücke ohne echte Baserow-ID (Anlage fehlgeschlagen oder offline)."""
+        return {pid for pid in self.selected_set if pid < 0} - self.pending_creates
+
     # --------------------------------------------
     def _refresh_selected_display(self):
         """Zeigt die bereits ausgewählten Stücke an."""
         self.selected_box.clear_widgets()
-        selected_pieces = [p for p in self.all_pieces if p["id"] in self.selected_set]
+        selected_pieces = [self.registry.get(pid) for pid in self.registry.sorted_ids(self.selected_set)]
         if not selected_pieces:
             self.selected_box.add_widget(Label(
                 text="(Noch keine Stücke ausgewählt)",
@@ -605,6 +2599,209 @@ class PieceSelectorAddOnly(BoxLayout):
 
 
 
+# -----------------------
+# AttendanceList (virtualisierte Spieler-Checkliste)
+# -----------------------
+# Hilfsfunktion zur Anzeige von Spielernamen
+def player_display_name(player):
+    pairs = [("Vorname", "Nachname"), ("vorname", "nachname"),
+             ("first_name", "last_name"), ("firstName", "lastName"),
+             ("given_name", "family_name"), ("FirstName", "LastName")]
+    for a, b in pairs:
+        if a in player and b in player and player[a] and player[b]:
+            return f"{player[a].strip()} {player[b].strip()}"
+    for single in ("Name", "name", "FullName", "full_name"):
+        if single in player and player[single]:
+            return player[single].strip()
+    for k, v in player.items():
+        if isinstance(v, str) and v.strip():
+            return v.strip()
+    return f"Spieler {player.get('id')}"
+
+# (Datensatzliste aus dem RecordStore, daraus gefilterte und sortierte Spieler)
+_sorted_players = (None, [])
+
+def load_players():
+    """
+    Gültige Spieler nach Nachname sortiert (läuft im Hintergrund). Gefiltert und
+    sortiert wird nur, wenn der RecordStore eine neue Liste liefert.
+    """
+    global _sorted_players
+    all_players = records.get(495)
+    source, players = _sorted_players
+    if source is not all_players:
+        players = sorted((p for p in all_players if p.valid), key=lambda p: p.sort_key)
+        _sorted_players = (all_players, players)
+    return players
+
+
+class PlayerCheckRow(RecycleDataViewBehavior, BoxLayout):
+    """Wiederverwendete Zeile (CheckBox + Name) einer AttendanceList."""
+    def __init__(self, **kwargs):
+        super().__init__(orientation="horizontal", **kwargs)
+        self.index = None
+        self.rv = None
+        self.checkbox = CheckBox(size_hint_x=0.15)
+        self.label = Label(size_hint_x=0.85, halign='left', valign='middle')
+        self.label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
+        self.add_widget(self.checkbox)
+        self.add_widget(self.label)
+        self.checkbox.bind(active=self._on_active)
+
+    def refresh_view_attrs(self, rv, index, data):
+        # Index zuerst setzen: das Setzen von active löst _on_active aus
+        self.rv = rv
+        self.index = index
+        self.label.text = data["text"]
+        self.checkbox.active = data["active"]
+
+    def _on_active(self, instance, value):
+        if self.rv is not None and self.index is not None:
+            self.rv.set_active(self.index, value)
+
+
+class AttendanceList(RecycleView):
+    """
+    Spieler-Checkliste auf Basis einer RecycleView: nur die sichtbaren Zeilen
+    existieren als Widgets, der Zustand liegt in einer einfachen Datenliste.
+    """
+    ROW_HEIGHT = 30
+    MAX_HEIGHT = 360
+
+    def __init__(self, selected_set, **kwargs):
+        super().__init__(size_hint_y=None, height=self.ROW_HEIGHT, **kwargs)
+        self.selected_set = selected_set
+        layout = RecycleBoxLayout(orientation="vertical", size_hint_y=None,
+                                  default_size=(None, self.ROW_HEIGHT), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter("height"))
+        self.add_widget(layout)
+        # viewclass erst nach dem LayoutManager setzen, sonst wird sie nicht übernommen
+        self.viewclass = PlayerCheckRow
+
+    def set_players(self, players):
+        self.data = [{"pid": p.id, "text": p.display, "active": p.id in self.selected_set}
+                     for p in players]
+        self.height = min(max(len(self.data), 1) * self.ROW_HEIGHT, self.MAX_HEIGHT)
+
+    def set_active(self, index, value):
+        item = self.data[index]
+        if item["active"] == value:
+            return
+        # Dict direkt ändern: die sichtbare Zeile zeigt den Zustand bereits an
+        item["active"] = value
+        if value:
+            self.selected_set.add(item["pid"])
+        else:
+            self.selected_set.discard(item["pid"])
+
+
+# -----------------------
+# RowModel (Änderungsverfolgung + Konflikterkennung)
+# -----------------------
+# Link-Felder der Probentabelle 749 (Werte: Listen von {"id", "value"})
+PROBE_LINK_FIELDS = ("dabei waren", "entschuldigt", "aufgef. Stücke")
+
+def _link_ids(value):
+    """ID-Menge eines Link-Felds; akzeptiert Serverwerte ({"id", "value"}) und reine IDs."""
+    return frozenset(item.get("id") if isinstance(item, dict) else item for item in value or ()) - {None}
+
+class RowModel:
+    """
+    Zeile mit Änderungsverfolgung. base ist der zuletzt bekannte Serverstand,
+    Link-Felder werden als ID-Mengen verglichen. merge() gleicht die eigenen
+    Änderungen mit dem aktuellen Serverstand ab: Link-Felder werden 3-Wege
+    zusammengeführt (eigene Hinzufügungen/Entfernungen auf den Serverstand),
+    andere Felder sind ein Konflikt, wenn beide Seiten sie geändert haben.
+    """
+    def __init__(self, table_id, row, link_fields=()):
+        self.table_id = table_id
+        self.row_id = row["id"]
+        self.link_fields = frozenset(link_fields)
+        self.reset(row)
+
+    def _normalize(self, field, value):
+        if field in self.link_fields:
+            return _link_ids(value)
+        return "" if value is None else value
+
+    def reset(self, row):
+        """Neuer Serverstand, eigene Änderungen verwerfen."""
+        self.base = {f: self._normalize(f, v) for f, v in row.items() if f != "id"}
+        self.values = {}
+
+    def get(self, field):
+        return self.values.get(field, self.base.get(field, self._normalize(field, None)))
+
+    def set(self, field, value):
+        self.values[field] = self._normalize(field, value)
+
+    def dirty_fields(self):
+        return [f for f, v in self.values.items() if v != self.base.get(f, self._normalize(f, None))]
+
+    def merge(self, server_row=None):
+        """
+        (payload, konflikte) gegen den aktuellen Serverstand; ohne server_row
+        (offline) gegen base. Der Payload enthält nur tatsächlich zu ändernde Felder.
+        """
+        payload, conflicts = {}, []
+        for field in self.dirty_fields():
+            mine = self.values[field]
+            base = self.base.get(field, self._normalize(field, None))
+            theirs = base if server_row is None else self._normalize(field, server_row.get(field))
+            if field in self.link_fields:
+                merged = (theirs | (mine - base)) - (base - mine)
+                if merged != theirs:
+                    payload[field] = sorted(merged)
+            elif theirs != base and theirs != mine:
+                conflicts.append(field)
+            elif theirs != mine:
+                payload[field] = mine
+        return payload, conflicts
+
+    def rebase(self, server_row, fields):
+        """Serverstand für fields übernehmen, damit die eigenen Werte ihn überschreiben."""
+        for field in fields:
+            self.base[field] = self._normalize(field, server_row.get(field))
+
+    def apply(self, payload):
+        """Gesendeten (oder vorgemerkten) Payload als neuen Stand übernehmen."""
+        for field, value in payload.items():
+            self.base[field] = self._normalize(field, value)
+        self.values = {}
+
+
+def save_row_model(model, force_fields=()):
+    """
+    Prüft den aktuellen Serverstand und sendet nur die geänderten Felder (läuft im Hintergrund).
+    Liefert (Ergebnis, Detail, Payload) mit Ergebnis "sent", "queued", "unchanged" oder "conflict".
+    """
+    try:
+        server_row = client.get_row(model.table_id, model.row_id)
+    except Exception as e:
+        if not is_offline_error(e):
+            raise
+        server_row = None  # offline: nur gegen den zuletzt bekannten Stand vergleichen
+    if server_row is not None and force_fields:
+        model.rebase(server_row, force_fields)
+
+    payload, conflicts = model.merge(server_row)
+    if conflicts:
+        return "conflict", (conflicts, server_row), payload
+    if not payload:
+        if server_row is not None:
+            model.reset(server_row)
+        return "unchanged", server_row, payload
+
+    outcome, detail = outbox.send("PATCH", model.table_id, model.row_id, payload)
+    if outcome == "sent" and detail:
+        model.reset(detail)
+    else:
+        if server_row is not None:
+            model.reset(server_row)
+        model.apply(payload)
+    return outcome, detail, payload
+
+
 # -----------------------
 # EditSelectedProbeScreen (korrigiert)
 # -----------------------
@@ -612,11 +2809,13 @@ class EditSelectedProbeScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.probe_id = None
-        self.players = []  # wird mit Einträgen {'id','display','_raw'} gefüllt
+        self._probe = self._player_list = self._piece_catalog = None
+        self._pieces_failed = False
+        self.notes_input = None
+        self.piece_selector = None
+        self.players = []  # PlayerRecords, geteilt über den RecordStore
         self.selected_dabei = set()
         self.selected_entschuldigt = set()
-        self.dabei_checkboxes = []
-        self.entschuldigt_checkboxes = []
 
         self.layout = BoxLayout(orientation="vertical", padding=10, spacing=5)
         self.status_label = Label(text="Probe bearbeiten", size_hint_y=None, height=30)
@@ -638,179 +2837,180 @@ class EditSelectedProbeScreen(Screen):
 
         self.add_widget(self.layout)
 
-    # Hilfsfunktion zur Anzeige von Spielernamen
-    def _player_display_name(self, player):
-        pairs = [("Vorname", "Nachname"), ("vorname", "nachname"),
-                 ("first_name", "last_name"), ("firstName", "lastName"),
-                 ("given_name", "family_name"), ("FirstName", "LastName")]
-        for a, b in pairs:
-            if a in player and b in player and player[a] and player[b]:
-                return f"{player[a].strip()} {player[b].strip()}"
-        for single in ("Name", "name", "FullName", "full_name"):
-            if single in player and player[single]:
-                return player[single].strip()
-        for k, v in player.items():
-            if isinstance(v, str) and v.strip():
-                return v.strip()
-        return f"Spieler {player.get('id')}"
-
-    # load_probe: BEACHTE -> Spieler werden jetzt AUF JEDEN FALL vor den Checkboxes geladen
+    def on_leave(self):
+        dispatcher.cancel(self)
+
+    # load_probe: Probe, Spieler und Stücke werden parallel geladen und jeder
+    # Abschnitt gerendert, sobald seine Daten da sind (Anwesenheit braucht Probe + Spieler)
     def load_probe(self, probe_id):
+        # Noch laufende Ladevorgänge einer vorher gewählten Probe verwerfen
+        dispatcher.cancel(self)
         self.probe_id = probe_id
         self.grid.clear_widgets()
         self.status_label.text = f"Lade Probe {probe_id} ..."
-
-        load_local_env()
-        base_url = os.getenv("BASEROW_URL")
-        api_token = os.getenv("API_TOKEN")
-        if not base_url or not api_token:
+        self._probe = self._player_list = self._piece_catalog = None
+        self._pieces_failed = False
+        self.model = None
+        self._saving = False
+        self._save_when_created = False
+        self.notes_input = None
+        self.piece_selector = None
+        self._perf = perf.begin("screen", "edit_selected_probe")
+
+        if not client.load_config():
             self.status_label.text = "Fehlende BASEROW_URL oder API_TOKEN"
             return
-        headers = {"Authorization": f"Token {api_token}"}
-
-        try:
-            # -------------------------
-            # Probe abrufen
-            # -------------------------
-            r = requests.get(f"{base_url}database/rows/table/749/{probe_id}/?user_field_names=true",
-                            headers=headers, timeout=10)
-            if r.status_code != 200:
-                self.status_label.text = f"Fehler beim Laden der Probe ({r.status_code})"
-                print("[ERROR] load_probe GET probe:", r.text)
-                return
-            probe = r.json()
-            print("[DEBUG] raw probe data:", probe)
 
-            # -------------------------
-            # Spieler abrufen
-            # -------------------------
-            r2 = requests.get(f"{base_url}database/rows/table/495/?user_field_names=true",
-                            headers=headers, timeout=10)
-            if r2.status_code != 200:
-                self.status_label.text = f"Fehler beim Laden der Spieler ({r2.status_code})"
-                print("[ERROR] load_probe GET players:", r2.text)
-                return
-            players_raw = r2.json().get("results", [])
-
-            # Spieler aufbereiten
-            players = []
-            for p in players_raw:
-                display = self._player_display_name(p)
-                if not re.search(r"[A-Za-zÄÖÜäöüß]", str(display)):
-                    continue
-                players.append({"id": p.get("id"), "display": display, "_raw": p})
-            players.sort(key=lambda x: (x["display"].split()[-1].lower(), x["display"].lower()))
-            self.players = players
+        # Platzhalter in fester Reihenfolge, befüllt in beliebiger Ankunftsreihenfolge
+        self.probe_box = self._section_box()
+        self.pieces_box = self._section_box()
+        self.attendance_box = self._section_box()
+
+        dispatcher.submit(self, client.get_row, 749, probe_id,
+                          on_success=self._on_probe_row,
+                          on_error=lambda e: self._on_part_error("Probe", e))
+        dispatcher.submit(self, load_players,
+                          on_success=self._on_players,
+                          on_error=lambda e: self._on_part_error("Spieler", e))
+        dispatcher.submit(self, load_piece_catalog,
+                          on_success=self._on_pieces,
+                          on_error=self._on_pieces_error)
+
+    def _section_box(self):
+        box = BoxLayout(orientation="vertical", spacing=5, size_hint_y=None)
+        box.bind(minimum_height=box.setter("height"))
+        self.grid.add_widget(box)
+        return box
+
+    def _on_part_error(self, part, e):
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler beim Laden der {part} ({e.status_code})"
+            print(f"[ERROR] load_probe GET {part}:", e.text)
+            return
+        self._on_load_error(e)
 
+    def _on_probe_row(self, probe):
+        self._probe = probe
+        self.model = RowModel(749, probe, link_fields=PROBE_LINK_FIELDS)
+        try:
             # -------------------------
             # Probe Name + Notizen
             # -------------------------
             pname = probe.get("Name") or "Unbenannt"
-            self.grid.add_widget(Label(text=f"Probe: {pname}", size_hint_y=None, height=30))
+            self.probe_box.add_widget(Label(text=f"Probe: {pname}", size_hint_y=None, height=30))
 
-            self.grid.add_widget(Label(text="Notizen:", size_hint_y=None, height=30))
+            self.probe_box.add_widget(Label(text="Notizen:", size_hint_y=None, height=30))
             self.notes_input = TextInput(text=str(probe.get("Notes") or ""), size_hint_y=None, height=100)
-            self.grid.add_widget(self.notes_input)
-            self.original_notes = str(probe.get("Notes") or "")
-
-            # -------------------------
-            # Aufgef. Stücke (Add-only)
-            # -------------------------
-            self.grid.add_widget(Label(
-                text="Aufgef. Stücke:",
-                size_hint_y=None,
-                height=30,
-                font_size=20
-            ))
-
-            r3 = requests.get(f"{base_url}database/rows/table/747/?user_field_names=true", headers=headers, timeout=10)
-            if r3.status_code == 200:
-                all_pieces = [
-                    {
-                        "id": p["id"],
-                        "value": f"{p.get('Name','')} - {p.get('Heft/Noten','')} - S. {p.get('Seite','')}".strip(" -")
-                    } for p in r3.json().get("results", [])
-                ]
-            else:
-                all_pieces = []
-
-            pre_pieces = probe.get("aufgef. Stücke", []) or []
-            selected_pieces = set(p["id"] for p in pre_pieces if isinstance(p, dict) and "id" in p)
-
-            self.piece_selector = PieceSelectorAddOnly(all_pieces, selected_set=selected_pieces)
-            # Callback, damit Anzeige bei Auswahl direkt aktualisiert wird
-            self.piece_selector.on_add_callback = lambda: None
-            self.grid.add_widget(self.piece_selector)
-
-            # -------------------------
-            # Dabei waren (Spieler)
-            # -------------------------
-            self.grid.add_widget(Label(
-                text="Dabei waren:",
-                size_hint_y=None,
-                height=30,
-                font_size=20,
-                color=get_color_from_hex("#00AA00")
-            ))
-            self.dabei_checkboxes = []
-            pre_dabei = probe.get("dabei waren", []) or []
-            orig_dabei_ids = set(item["id"] for item in pre_dabei if isinstance(item, dict) and "id" in item)
-            self.original_dabei = orig_dabei_ids.copy()
-            self.selected_dabei = set(orig_dabei_ids)
-            self._add_checkboxes_from_players(self.players, self.dabei_checkboxes, pre_dabei, self.selected_dabei)
-
-            # -------------------------
-            # Entschuldigt (Spieler)
-            # -------------------------
-            self.grid.add_widget(Label(
-                text="Entschuldigt:",
-                size_hint_y=None,
-                height=30,
-                font_size=20,
-                color=get_color_from_hex("#AA0000")
-            ))
-            self.entschuldigt_checkboxes = []
-            pre_ents = probe.get("entschuldigt", []) or []
-            orig_ents_ids = set(item["id"] for item in pre_ents if isinstance(item, dict) and "id" in item)
-            self.original_entschuldigt = orig_ents_ids.copy()
-            self.selected_entschuldigt = set(orig_ents_ids)
-            self._add_checkboxes_from_players(self.players, self.entschuldigt_checkboxes, pre_ents, self.selected_entschuldigt)
-
-            self.status_label.text = f"Probe '{pname}' geladen ✅"
-
+            self.probe_box.add_widget(self.notes_input)
         except Exception as e:
-            self.status_label.text = f"Fehler: {e}"
-            print("load_probe ERROR:", e)
+            self._on_load_error(e)
+        self._render_pieces()
+        self._render_attendance()
+
+    def _on_players(self, players):
+        self.players = self._player_list = players
+        self._render_attendance()
+
+    def _on_pieces_error(self, e):
+        # Fehler melden, dann nur mit den verknüpften Stücken der Probe weiter
+        self._on_part_error("Stücke", e)
+        self._pieces_failed = True
+        self._render_pieces()
+
+    def _linked_pieces_catalog(self):
+        """Ersatzkatalog aus den Link-Werten der Probe, damit verknüpfte Stücke sichtbar bleiben."""
+        pieces = [PieceRecord({"id": link["id"], "Name": link.get("value")})
+                  for link in self._probe.get("aufgef. Stücke") or () if isinstance(link, dict)]
+        return PieceRegistry(pieces), SearchIndex(PIECE_SEARCH_FIELDS).build((p.id, p) for p in pieces)
+
+    def _on_pieces(self, catalog):
+        self._piece_catalog = catalog
+        self._render_pieces()
+
+    def _check_complete(self):
+        if self.piece_selector is not None and self._player_list is not None and self._probe is not None:
+            pname = self._probe.get("Name") or "Unbenannt"
+            if self._pieces_failed:
+                self.status_label.text = f"Probe '{pname}' geladen – Stückliste nicht verfügbar"
+            else:
+                self.status_label.text = f"Probe '{pname}' geladen ✅"
+            perf.end(self._perf, probe=self._probe.get("id"))
+            self._perf = None
 
+    def _render_pieces(self):
+        if self._probe is None or (self._piece_catalog is None and not self._pieces_failed):
+            return
+        if self._piece_catalog is None:
+            self._piece_catalog = self._linked_pieces_catalog()
+        with perf.measure("widgets", "probe_pieces", rows=len(self._piece_catalog[1])):
+            try:
+                # -------------------------
+                # Aufgef. Stücke (Add-only)
+                # -------------------------
+                self.pieces_box.add_widget(Label(
+                    text="Aufgef. Stücke:",
+                    size_hint_y=None,
+                    height=30,
+                    font_size=20
+                ))
+
+                selected_pieces = set(self.model.get("aufgef. Stücke"))
+
+                self.piece_selector = PieceSelectorAddOnly(self._piece_catalog, selected_set=selected_pieces)
+                self.piece_selector.on_created_callback = self._on_piece_created
+                # Callback, damit Anzeige bei Auswahl direkt aktualisiert wird
+                self.piece_selector.on_add_callback = lambda: None
+                self.pieces_box.add_widget(self.piece_selector)
+            except Exception as e:
+                self._on_load_error(e)
+        self._check_complete()
+
+    def _render_attendance(self):
+        if self._probe is None or self._player_list is None:
+            return
+        with perf.measure("widgets", "probe_attendance", rows=len(self.players)):
+            try:
+                # -------------------------
+                # Dabei waren (Spieler)
+                # -------------------------
+                self.attendance_box.add_widget(Label(
+                    text="Dabei waren:",
+                    size_hint_y=None,
+                    height=30,
+                    font_size=20,
+                    color=get_color_from_hex("#00AA00")
+                ))
+                self.selected_dabei = set(self.model.get("dabei waren"))
+                self.dabei_list = AttendanceList(self.selected_dabei)
+                self.dabei_list.set_players(self.players)
+                self.attendance_box.add_widget(self.dabei_list)
+
+                # -------------------------
+                # Entschuldigt (Spieler)
+                # -------------------------
+                self.attendance_box.add_widget(Label(
+                    text="Entschuldigt:",
+                    size_hint_y=None,
+                    height=30,
+                    font_size=20,
+                    color=get_color_from_hex("#AA0000")
+                ))
+                self.selected_entschuldigt = set(self.model.get("entschuldigt"))
+                self.entschuldigt_list = AttendanceList(self.selected_entschuldigt)
+                self.entschuldigt_list.set_players(self.players)
+                self.attendance_box.add_widget(self.entschuldigt_list)
+            except Exception as e:
+                self._on_load_error(e)
+        self._check_complete()
+
+    def _on_load_error(self, e):
+        self.status_label.text = f"Fehler: {e}"
+        print("load_probe ERROR:", e)
 
 
 
 
 
-    # Checkbox-Liste bauen
-    def _add_checkboxes_from_players(self, players, store_list, preselected, selected_set):
-        pre_ids = set(item["id"] for item in preselected if isinstance(item, dict) and "id" in item)
-        for pl in players:
-            pid, pname = pl["id"], pl["display"]
-            box = BoxLayout(orientation="horizontal", size_hint_y=None, height=30)
-            cb = CheckBox(active=(pid in pre_ids), size_hint_x=0.15)
-            lbl = Label(text=pname, size_hint_x=0.85, halign='left', valign='middle')
-            lbl.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
-            box.add_widget(cb)
-            box.add_widget(lbl)
-            self.grid.add_widget(box)
-            store_list.append((cb, pid))
-            if cb.active:
-                selected_set.add(pid)
-            cb.bind(active=self._make_checkbox_handler(pid, selected_set))
-
-    def _make_checkbox_handler(self, pid, target_set):
-        def handler(instance, value):
-            if value:
-                target_set.add(pid)
-            else:
-                target_set.discard(pid)
-        return handler
 
     # Anzeige der ausgewählten Stücke (wird vom PieceSelector und initial genutzt)
     def _update_selected_pieces_display(self, pieces):
@@ -825,58 +3025,490 @@ class EditSelectedProbeScreen(Screen):
             lbl.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
             self.selected_pieces_box.add_widget(lbl)
 
-    # Speichern (wie vorher)
+    # Speichern: nur geänderte Felder, abgeglichen mit dem aktuellen Serverstand
     def save_changes(self, instance):
         if not self.probe_id:
             self.status_label.text = "Keine Probe geladen"
             return
-
-        load_local_env()
-        base_url = os.getenv("BASEROW_URL")
-        api_token = os.getenv("API_TOKEN")
-        if not base_url or not api_token:
+        if self.notes_input is None or self.piece_selector is None or self._player_list is None:
+            self.status_label.text = "Probe wird noch geladen …"
+            return
+        if self._saving:
+            self.status_label.text = "Speichern läuft bereits …"
+            return
+        # Neue Stücke brauchen erst ihre echte ID aus Baserow
+        if self.piece_selector.pending_creates:
+            self._save_when_created = True
+            self.status_label.text = "Warte auf Anlage neuer Stücke …"
+            return
+        if not client.load_config():
             self.status_label.text = "Fehlende BASEROW_URL oder API_TOKEN"
             return
-        headers = {"Authorization": f"Token {api_token}"}
-
-        payload = {}
-        current_notes = self.notes_input.text or ""
-        if current_notes != getattr(self, "original_notes", ""):
-            payload["Notes"] = current_notes
-        if set(getattr(self, "selected_dabei", set())) != getattr(self, "original_dabei", set()):
-            payload["dabei waren"] = list(self.selected_dabei)
-        if set(getattr(self, "selected_entschuldigt", set())) != getattr(self, "original_entschuldigt", set()):
-            payload["entschuldigt"] = list(self.selected_entschuldigt)
-        if getattr(self, "piece_selector", None) and self.piece_selector.selected_set:
-            payload["aufgef. Stücke"] = list(self.piece_selector.selected_set)
-
-        if not payload:
+
+        self.model.set("Notes", self.notes_input.text or "")
+        self.model.set("dabei waren", self.selected_dabei)
+        self.model.set("entschuldigt", self.selected_entschuldigt)
+        # Stücke ohne echte ID (offline vorgemerkt oder fehlgeschlagen) bleiben ausgewählt,
+        # werden aber nicht verknüpft; alles andere wird trotzdem gespeichert
+        unresolved = self.piece_selector.unresolved_ids()
+        self.model.set("aufgef. Stücke", self.piece_selector.selected_set - unresolved)
+        if not self.model.dirty_fields():
+            self.status_label.text = "Keine Änderungen zu speichern" + self._pending_note()
+            return
+        self._submit_save()
+
+    def _pending_note(self):
+        """Hinweis auf ausgewählte Stücke, die noch nicht in Baserow angelegt sind."""
+        unresolved = self.piece_selector.unresolved_ids()
+        if not unresolved:
+            return ""
+        names = ", ".join(self.piece_selector.registry.get(pid).name for pid in sorted(unresolved))
+        return f" – nicht verknüpft (noch nicht angelegt): {names}"
+
+    def _on_piece_created(self, selector):
+        # Anlage aus einer inzwischen verlassenen Probe: deren Selector ist nicht mehr aktuell
+        if selector is not self.piece_selector:
+            return
+        selector._refresh_selected_display()
+        if self._save_when_created and not self.piece_selector.pending_creates:
+            self._save_when_created = False
+            self.save_changes(None)
+
+    def _submit_save(self, force_fields=()):
+        self._saving = True
+        self.status_label.text = "Speichere …"
+        model = self.model
+        # Nicht abbrechbar (Schreibzugriff): das Ergebnis kann nach einem Probenwechsel eintreffen
+        dispatcher.submit(None, save_row_model, model, force_fields,
+                          on_success=lambda result: self._on_saved(result, model),
+                          on_error=lambda e: self._on_save_error(e, model))
+
+    def _is_current(self, model):
+        """Gehört model noch zur angezeigten Probe? (sonst wurde inzwischen gewechselt)"""
+        return model is not None and model is self.model and model.row_id == self.probe_id
+
+    def _on_saved(self, result, model):
+        if not self._is_current(model):
+            print(f"[INFO] Speicherergebnis für Probe {model.row_id} nach Probenwechsel nicht angezeigt")
+            return
+        self._saving = False
+        outcome, detail, _ = result
+        if outcome == "conflict":
+            self._show_conflict(detail[0], model)
+            return
+        self._sync_from_model()
+        if outcome == "queued":
+            self.status_label.text = f"Offline – Änderungen vorgemerkt ({detail} ausstehend)"
+        elif outcome == "unchanged":
             self.status_label.text = "Keine Änderungen zu speichern"
+        else:
+            self.status_label.text = "Änderungen gespeichert ✅"
+        self.status_label.text += self._pending_note()
+
+    def _sync_from_model(self):
+        """Zusammengeführten Stand (inkl. Änderungen anderer) in die Anzeige übernehmen."""
+        self.notes_input.text = str(self.model.get("Notes"))
+        unresolved = self.piece_selector.unresolved_ids()
+        for selected, field in ((self.selected_dabei, "dabei waren"),
+                                (self.selected_entschuldigt, "entschuldigt"),
+                                (self.piece_selector.selected_set, "aufgef. Stücke")):
+            # In place, die Listen halten Referenzen auf diese Mengen
+            selected.clear()
+            selected.update(self.model.get(field))
+        # Noch nicht angelegte Stücke sind nicht im Modell, bleiben aber ausgewählt
+        self.piece_selector.selected_set.update(unresolved)
+        self.dabei_list.set_players(self.players)
+        self.entschuldigt_list.set_players(self.players)
+        self.piece_selector._refresh_selected_display()
+
+    def _show_conflict(self, fields, model):
+        self.status_label.text = "Konflikt – Probe wurde inzwischen geändert"
+        content = BoxLayout(orientation="vertical", spacing=5)
+        content.add_widget(Label(text=f"Inzwischen von jemand anderem geändert:\n{', '.join(fields)}"))
+        btn_layout = BoxLayout(orientation="horizontal", size_hint_y=None, height=40, spacing=10)
+        popup = Popup(title="Konflikt", content=content, size_hint=(0.8, 0.5), auto_dismiss=False)
+
+        def overwrite(instance):
+            popup.dismiss()
+            if self._is_current(model):
+                self._submit_save(force_fields=fields)
+
+        def reload(instance):
+            popup.dismiss()
+            if self._is_current(model):
+                self.load_probe(model.row_id)
+
+        btn_layout.add_widget(Button(text="Überschreiben", on_release=overwrite))
+        btn_layout.add_widget(Button(text="Neu laden", on_release=reload))
+        content.add_widget(btn_layout)
+        popup.open()
+
+    def _on_save_error(self, e, model):
+        if not self._is_current(model):
+            print(f"[ERROR] save_changes (Probe {model.row_id}, nicht mehr angezeigt):", e)
+            return
+        self._saving = False
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler beim Speichern: {e.status_code}"
+            print("[ERROR] save_changes:", e.status_code, e.text)
             return
+        self.status_label.text = f"Fehler: {e}"
+        print("save_changes ERROR:", e)
 
-        try:
-            r = requests.patch(
-                f"{base_url}database/rows/table/749/{self.probe_id}/?user_field_names=true",
-                headers=headers,
-                json=payload,
-                timeout=10
-            )
-            if r.status_code == 200:
-                self.status_label.text = "Änderungen gespeichert ✅"
-                self.original_notes = payload.get("Notes", self.original_notes)
-                if "dabei waren" in payload:
-                    self.original_dabei = set(payload["dabei waren"])
-                if "entschuldigt" in payload:
-                    self.original_entschuldigt = set(payload["entschuldigt"])
+    def go_back(self, instance):
+        self.manager.current = "edit_probe"
+
+
+
+# -----------------------
+# Anwesenheitsstatistik (Bitsets über alle Proben)
+# -----------------------
+# Python-Ints als Bitsets: Bit i = i-te Probe in Datumsreihenfolge. Popcount und
+# Verknüpfungen laufen über ganze Saisons in C, ohne NumPy-Abhängigkeit auf Android.
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:
+    def _popcount(x):
+        return bin(x).count("1")
+
+def _longest_run(bits):
+    """Längste Folge gesetzter Bits (jede Runde kürzt alle Folgen um eins)."""
+    n = 0
+    while bits:
+        bits &= bits << 1
+        n += 1
+    return n
+
+def _trailing_run(bits, n):
+    """Gesetzte Bits in Folge, rückwärts ab Bit n-1 (= aktuelle Serie)."""
+    gaps = ~bits & ((1 << n) - 1)
+    return n - gaps.bit_length()
+
+
+class AttendanceStats:
+    """
+    Anwesenheit je Spieler als Bitset über alle Proben aus Tabelle 749.
+    update() übernimmt nur geänderte Proben; neue Proben am Ende der Saison
+    werden angehängt, nur bei Löschungen oder Datumsänderungen wird neu aufgebaut.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signatures = {}  # Proben-ID -> (Datum, dabei-IDs, entschuldigt-IDs)
+        self._columns = {}     # Proben-ID -> Bitposition
+        self._dates = []       # Bitposition -> Datum (sortiert)
+        self.present = {}      # Spieler-ID -> Bitset "dabei waren"
+        self.excused = {}      # Spieler-ID -> Bitset "entschuldigt"
+        self._report = None
+        self._report_key = None
+
+    def update(self, rows):
+        """Gleicht mit den ProbeRecords ab, liefert die Anzahl geänderter Proben."""
+        signatures = {}
+        for probe in rows:
+            if probe.datum:
+                signatures[probe.id] = (probe.datum, frozenset(probe.dabei), frozenset(probe.entschuldigt))
+
+        with self._lock:
+            old = self._signatures
+            changed = [rid for rid, sig in signatures.items() if old.get(rid) != sig]
+            removed = old.keys() - signatures.keys()
+            if not changed and not removed:
+                return 0
+
+            added = sorted((rid for rid in changed if rid not in old),
+                           key=lambda rid: (signatures[rid][0], rid))
+            moved = any(old[rid][0] != signatures[rid][0] for rid in changed if rid in old)
+            if removed or moved or (added and self._dates and signatures[added[0]][0] < self._dates[-1]):
+                self._rebuild(signatures)
             else:
-                self.status_label.text = f"Fehler beim Speichern: {r.status_code}"
-                print("[ERROR] save_changes:", r.status_code, r.text)
-        except Exception as e:
-            self.status_label.text = f"Fehler: {e}"
-            print("save_changes ERROR:", e)
+                for rid in changed:
+                    if rid in old:
+                        self._set_bits(self._columns[rid], old[rid], on=False)
+                        self._set_bits(self._columns[rid], signatures[rid], on=True)
+                for rid in added:
+                    self._columns[rid] = len(self._dates)
+                    self._dates.append(signatures[rid][0])
+                    self._set_bits(self._columns[rid], signatures[rid], on=True)
+
+            self._signatures = signatures
+            self._report = None
+            return len(changed) + len(removed)
+
+    def _rebuild(self, signatures):
+        order = sorted(signatures, key=lambda rid: (signatures[rid][0], rid))
+        self._columns = {rid: col for col, rid in enumerate(order)}
+        self._dates = [signatures[rid][0] for rid in order]
+        self.present, self.excused = {}, {}
+        for rid, col in self._columns.items():
+            self._set_bits(col, signatures[rid], on=True)
+
+    def _set_bits(self, col, signature, on):
+        bit = 1 << col
+        for target, ids in ((self.present, signature[1]), (self.excused, signature[2])):
+            for pid in ids:
+                target[pid] = target.get(pid, 0) | bit if on else target.get(pid, 0) & ~bit
+
+    def report(self, players, today=None):
+        """
+        Kennzahlen je Spieler über alle bereits stattgefundenen Proben,
+        zwischengespeichert bis sich Proben, Spieler oder der Tag ändern.
+        """
+        today = (today or date.today()).isoformat()
+        with self._lock:
+            held = bisect_right(self._dates, today)
+            key = (held, tuple((p.id, p.display) for p in players))
+            if self._report is not None and self._report_key == key:
+                return self._report
+
+            held_mask = (1 << held) - 1
+            months = {}
+            for col, datum in enumerate(self._dates[:held]):
+                months[datum[:7]] = months.get(datum[:7], 0) | (1 << col)
+
+            rows = []
+            for p in players:
+                present = self.present.get(p.id, 0) & held_mask
+                excused = self.excused.get(p.id, 0) & held_mask
+                rows.append({
+                    "id": p.id,
+                    "display": p.display,
+                    "present": _popcount(present),
+                    "excused": _popcount(excused),
+                    "rate": _popcount(present) / held if held else 0.0,
+                    "excused_rate": _popcount(excused) / held if held else 0.0,
+                    "streak": _trailing_run(present, held),
+                    "best_streak": _longest_run(present),
+                    "months": {m: _popcount(present & mask) / _popcount(mask) for m, mask in months.items()},
+                })
+
+            trend = []
+            for m, mask in months.items():
+                total = sum(_popcount(self.present.get(p.id, 0) & mask) for p in players)
+                trend.append((m, total / (_popcount(mask) * len(players)) if players else 0.0))
+
+            self._report = {"held": held, "players": rows, "months": trend}
+            self._report_key = key
+            return self._report
+
+
+attendance_stats = AttendanceStats()
+
+def compute_attendance_report():
+    """Proben und Spieler aus dem Cache, Bitsets nachführen (läuft im Hintergrund)."""
+    with perf.measure("compute", "attendance_stats") as fields:
+        fields["changed"] = attendance_stats.update(records.get(749))
+        return attendance_stats.report(load_players())
+
+
+class AttendanceStatsScreen(Screen):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        layout = BoxLayout(orientation="vertical", padding=10, spacing=5)
+        self.status_label = Label(text="Anwesenheitsstatistik", size_hint_y=None, height=30)
+        layout.add_widget(self.status_label)
+
+        scroll = ScrollView()
+        self.grid = GridLayout(cols=1, spacing=2, size_hint_y=None)
+        self.grid.bind(minimum_height=self.grid.setter("height"))
+        scroll.add_widget(self.grid)
+        layout.add_widget(scroll)
+
+        back_btn = Button(text="Zurück", size_hint_y=None, height=40)
+        back_btn.bind(on_release=self.go_back)
+        layout.add_widget(back_btn)
+        self.add_widget(layout)
+
+    def on_pre_enter(self):
+        if not client.load_config():
+            self.status_label.text = "Fehlende BASEROW_URL oder API_TOKEN"
+            return
+        self.status_label.text = "Berechne Statistik …"
+        self._perf = perf.begin("screen", "attendance_stats")
+        dispatcher.submit(self, compute_attendance_report,
+                          on_success=self._on_report,
+                          on_error=self._on_error)
+
+    def on_leave(self):
+        dispatcher.cancel(self)
+
+    def _line(self, text, **kwargs):
+        lbl = Label(text=text, size_hint_y=None, height=28, halign="left", valign="middle", **kwargs)
+        lbl.bind(size=lambda instance, value: setattr(instance, "text_size", (instance.width, None)))
+        self.grid.add_widget(lbl)
+
+    def _on_report(self, report):
+        with perf.measure("widgets", "attendance_stats", rows=len(report["players"])):
+            self.grid.clear_widgets()
+            self.status_label.text = f"Anwesenheit über {report['held']} Proben"
+
+            self._line("Verlauf je Monat:", bold=True)
+            for month, rate in report["months"][-12:]:
+                self._line(f"{month}: {rate:.0%}")
+
+            self._line("Spieler:", bold=True)
+            for p in sorted(report["players"], key=lambda p: (-p["rate"], p["display"].lower())):
+                self._line(f"{p['display']}: {p['rate']:.0%} dabei, {p['excused_rate']:.0%} entschuldigt, "
+                           f"Serie {p['streak']} (max. {p['best_streak']})")
+        perf.end(self._perf, rows=len(report["players"]))
+
+    def _on_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler beim Laden: {e.status_code}"
+            print("[ERROR] Anwesenheitsstatistik:", e.text)
+            return
+        self.status_label.text = f"Fehler: {e}"
+        print("attendance stats ERROR:", e)
 
     def go_back(self, instance):
-        self.manager.current = "edit_probe"
+        self.manager.current = "main_menu"
+
+
+
+# -----------------------
+# Stückhäufigkeit (Index über "aufgef. Stücke")
+# -----------------------
+class PieceRehearsalIndex:
+    """
+    Invertierter Index Stück-ID -> Probendaten aus "aufgef. Stücke" (Tabelle 749).
+    Wie AttendanceStats werden bei update() nur geänderte Proben nachgeführt.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signatures = {}  # Proben-ID -> (Datum, Stück-IDs)
+        self.dates = {}        # Stück-ID -> sortierte Probendaten (mehrfach bei mehreren Proben am Tag)
+
+    def update(self, rows):
+        signatures = {}
+        for probe in rows:
+            if probe.datum:
+                signatures[probe.id] = (probe.datum, frozenset(probe.stuecke))
+
+        with self._lock:
+            old = self._signatures
+            changed = [rid for rid, sig in signatures.items() if old.get(rid) != sig]
+            removed = old.keys() - signatures.keys()
+            for rid in changed + list(removed):
+                if rid in old:
+                    datum, pieces = old[rid]
+                    for pid in pieces:
+                        dates = self.dates[pid]
+                        dates.pop(bisect_left(dates, datum))
+                        if not dates:
+                            del self.dates[pid]
+                if rid in signatures:
+                    datum, pieces = signatures[rid]
+                    for pid in pieces:
+                        insort(self.dates.setdefault(pid, []), datum)
+            self._signatures = signatures
+            return len(changed) + len(removed)
+
+    def stats(self, piece_id, until):
+        """(Anzahl Proben, letztes Probendatum) bis einschließlich until."""
+        with self._lock:
+            dates = self.dates.get(piece_id, ())
+            n = bisect_right(dates, until)
+            return n, dates[n - 1] if n else None
+
+
+piece_index = PieceRehearsalIndex()
+
+def compute_piece_report(weeks, today=None):
+    """Stücke, die seit `weeks` Wochen nicht geprobt wurden, und Häufigkeiten (läuft im Hintergrund)."""
+    today = today or date.today()
+    with perf.measure("compute", "piece_index") as fields:
+        fields["changed"] = piece_index.update(records.get(749))
+    until = today.isoformat()
+    cutoff = (today - timedelta(weeks=weeks)).isoformat()
+
+    pieces = []
+    for p in records.get(747):
+        count, last = piece_index.stats(p.id, until)
+        pieces.append({"id": p.id, "name": p.name, "heft": p.heft, "count": count, "last": last})
+    stale = [p for p in pieces if not p["last"] or p["last"] < cutoff]
+    stale.sort(key=lambda p: (p["last"] or "", p["name"].lower()))
+    pieces.sort(key=lambda p: (-p["count"], p["name"].lower()))
+    return {"stale": stale, "counts": pieces}
+
+
+class PieceStatsScreen(Screen):
+    # Häufigkeitsliste nur für die meistgeprobten Stücke, der Rest steht bei "nicht geprobt"
+    TOP_COUNT = 50
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        layout = BoxLayout(orientation="vertical", padding=10, spacing=5)
+        self.status_label = Label(text="Stückhäufigkeit", size_hint_y=None, height=30)
+        layout.add_widget(self.status_label)
+
+        weeks_layout = BoxLayout(orientation="horizontal", size_hint_y=None, height=40, spacing=10)
+        weeks_layout.add_widget(Label(text="Nicht geprobt seit Wochen:"))
+        self.weeks_input = TextInput(text="8", multiline=False, input_filter="int", size_hint_x=0.3)
+        weeks_layout.add_widget(self.weeks_input)
+        refresh_btn = Button(text="Aktualisieren", size_hint_x=0.5)
+        refresh_btn.bind(on_release=lambda instance: self.load_report())
+        weeks_layout.add_widget(refresh_btn)
+        layout.add_widget(weeks_layout)
+
+        scroll = ScrollView()
+        self.grid = GridLayout(cols=1, spacing=2, size_hint_y=None)
+        self.grid.bind(minimum_height=self.grid.setter("height"))
+        scroll.add_widget(self.grid)
+        layout.add_widget(scroll)
+
+        back_btn = Button(text="Zurück", size_hint_y=None, height=40)
+        back_btn.bind(on_release=self.go_back)
+        layout.add_widget(back_btn)
+        self.add_widget(layout)
+
+    def on_pre_enter(self):
+        self.load_report()
+
+    def on_leave(self):
+        dispatcher.cancel(self)
+
+    def load_report(self):
+        if not client.load_config():
+            self.status_label.text = "Fehlende BASEROW_URL oder API_TOKEN"
+            return
+        weeks = int(self.weeks_input.text or 0)
+        dispatcher.cancel(self)
+        self.status_label.text = "Berechne …"
+        self._perf = perf.begin("screen", "piece_stats")
+        dispatcher.submit(self, compute_piece_report, weeks,
+                          on_success=lambda report: self._on_report(report, weeks),
+                          on_error=self._on_error)
+
+    def _line(self, text, **kwargs):
+        lbl = Label(text=text, size_hint_y=None, height=28, halign="left", valign="middle", **kwargs)
+        lbl.bind(size=lambda instance, value: setattr(instance, "text_size", (instance.width, None)))
+        self.grid.add_widget(lbl)
+
+    def _on_report(self, report, weeks):
+        with perf.measure("widgets", "piece_stats", rows=len(report["counts"])):
+            self.grid.clear_widgets()
+            self.status_label.text = f"{len(report['stale'])} Stücke seit {weeks} Wochen nicht geprobt"
+
+            self._line(f"Nicht geprobt seit {weeks} Wochen:", bold=True)
+            for p in report["stale"]:
+                self._line(f"{p['name']} ({p['heft']}) – zuletzt {p['last'] or 'nie'}")
+
+            self._line("Am häufigsten geprobt:", bold=True)
+            for p in report["counts"][:self.TOP_COUNT]:
+                if not p["count"]:
+                    break
+                self._line(f"{p['count']}× {p['name']} ({p['heft']})")
+        perf.end(self._perf, rows=len(report["counts"]))
+
+    def _on_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler beim Laden: {e.status_code}"
+            print("[ERROR] Stückhäufigkeit:", e.text)
+            return
+        self.status_label.text = f"Fehler: {e}"
+        print("piece stats ERROR:", e)
+
+    def go_back(self, instance):
+        self.manager.current = "main_menu"
 
 
 
@@ -898,27 +3530,129 @@ class AutocompleteTextInput(BoxLayout):
         self.scroll.add_widget(self.suggestion_box)
         self.add_widget(self.scroll)
 
+        self.suggestions = SuggestionPool(self.suggestion_box, self.select)
+        self.search = IncrementalSearch(
+            lambda ids: self.suggestions.show([(self._all_options[i], self._all_options[i]) for i in ids]))
+        self.search.set_index(self.search_index)
         self.text_input.bind(text=self.on_text)
 
+    @property
+    def all_options(self):
+        return self._all_options
+
+    @all_options.setter
+    def all_options(self, options):
+        # Index einmal pro Optionsliste aufbauen statt bei jedem Tastendruck zu scannen
+        self._all_options = list(options)
+        self.search_index = SearchIndex({"value": 1}).build(
+            (i, {"value": opt}) for i, opt in enumerate(self._all_options))
+        if hasattr(self, "search"):
+            self.search.set_index(self.search_index)
+
     def on_text(self, instance, value):
-        self.suggestion_box.clear_widgets()
-        query = value.strip().lower()
-        if not query:
-            return
-        matches = [opt for opt in self.all_options if query in opt.lower()]
-        for m in matches[:10]:
-            btn = Button(text=m, size_hint_y=None, height=30)
-            btn.bind(on_release=lambda b, text=m: self.select(text))
-            self.suggestion_box.add_widget(btn)
+        self.search.query(value)
 
     def select(self, text):
         self.text_input.text = text
-        self.suggestion_box.clear_widgets()
+        # Übernahme des Vorschlags soll keine neue Suche auslösen
+        self.search.cancel()
+        self.suggestions.clear()
 
     def get_text(self):
         return self.text_input.text.strip()
 
 
+# ---------------------------------------------------
+# 🔹 Notenimport (CSV/JSON -> Tabelle 747)
+# ---------------------------------------------------
+# Spaltennamen aus Fremddateien -> Baserow-Felder (Vergleich kleingeschrieben)
+SHEETMUSIC_COLUMNS = {
+    "name": "Name", "titel": "Name", "stück": "Name",
+    "heft/noten": "Heft/Noten", "heft": "Heft/Noten", "noten": "Heft/Noten",
+    "seite": "Seite",
+    "komponist": "Komponist",
+}
+
+def sheetmusic_key(name, heft):
+    """Duplikatschlüssel: ein Stück gilt als vorhanden, wenn Name und Heft/Noten gleich sind."""
+    return normalize_search_text(name).strip(), normalize_search_text(heft).strip()
+
+def _sheetmusic_record(raw):
+    record = {}
+    for column, value in raw.items():
+        field = SHEETMUSIC_COLUMNS.get(str(column or "").strip().lower())
+        value = str(value).strip() if value is not None else ""
+        if field and value:
+            record[field] = value
+    return record
+
+def iter_sheetmusic_file(path):
+    """
+    Liest Stücke zeilenweise aus einer CSV- (Trenner ; oder ,) oder JSON-Datei.
+    JSON Lines wird gestreamt, ein JSON-Array muss komplett gelesen werden.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if Path(path).suffix.lower() in (".json", ".jsonl"):
+            head = f.read(1)
+            while head.isspace():
+                head = f.read(1)
+            if head == "[":
+                f.seek(0)
+                for raw in json.load(f):
+                    yield _sheetmusic_record(raw)
+                return
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield _sheetmusic_record(json.loads(line))
+            return
+
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        for raw in csv.DictReader(f, dialect=dialect):
+            yield _sheetmusic_record(raw)
+
+def import_sheetmusic(path):
+    """
+    Importiert Stücke in Blöcken über den batch/-Endpunkt (Hintergrund-Generator).
+    Vorhandene Stücke (Cache) und Doppelte innerhalb der Datei werden übersprungen.
+    Liefert nach jedem Block {"created": [...], "read", "skipped", "invalid"}.
+    """
+    known = {sheetmusic_key(p.name, p.heft) for p in records.get(747)}
+    stats = {"read": 0, "skipped": 0, "invalid": 0}
+    batch = []
+
+    def send(batch):
+        created = client.batch_create_rows(747, batch)
+        # Cache mitführen, damit weder Autocomplete noch Stückauswahl neu laden müssen
+        if row_cache.is_cached(747):
+            row_cache.upsert_rows(747, created)
+        return dict(stats, created=created)
+
+    for record in iter_sheetmusic_file(path):
+        stats["read"] += 1
+        if not record.get("Name") or not record.get("Heft/Noten"):
+            stats["invalid"] += 1
+            continue
+        key = sheetmusic_key(record["Name"], record["Heft/Noten"])
+        if key in known:
+            stats["skipped"] += 1
+            continue
+        known.add(key)
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            yield send(batch)
+            batch = []
+    if batch:
+        yield send(batch)
+    else:
+        yield dict(stats, created=[])
+
+
 class AddSheetMusicScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -957,34 +3691,65 @@ class AddSheetMusicScreen(Screen):
         btn_layout.add_widget(cancel_btn)
         self.layout.add_widget(btn_layout)
 
+        # Import aus Datei
+        import_layout = BoxLayout(orientation="horizontal", size_hint_y=None, height=40, spacing=10)
+        self.import_input = TextInput(hint_text="Datei (CSV/JSON)", multiline=False)
+        import_btn = Button(text="Importieren", size_hint_x=0.4)
+        import_btn.bind(on_release=self.import_file)
+        import_layout.add_widget(self.import_input)
+        import_layout.add_widget(import_btn)
+        self.layout.add_widget(import_layout)
+
         # Status
         self.status_label = Label(text="", size_hint_y=None, height=30)
         self.layout.add_widget(self.status_label)
 
-        # Optionen für Autocomplete laden
+        self._heft_options = set()
+        self._komponist_options = set()
+        realtime.add_listener(self._on_realtime)
+
+    def _on_realtime(self, table_id, kind, rows, row_ids):
+        # Von anderen angelegte Stücke direkt in die Vorschläge übernehmen
+        if table_id == 747 and rows:
+            self._add_options(PieceRecord(r) for r in rows)
+
+    def on_pre_enter(self):
+        # Optionen für Autocomplete laden (aus dem Cache, nach Ablauf der TTL abgeglichen)
         self.load_existing_options()
 
     def load_existing_options(self):
         """Lädt vorhandene Heft/Noten und Komponisten aus Tabelle 747"""
-        load_local_env()
-        base_url = os.getenv("BASEROW_URL")
-        api_token = os.getenv("API_TOKEN")
-        if not base_url or not api_token:
+        if not client.load_config():
             self.status_label.text = "BASEROW_URL oder API_TOKEN fehlt"
             return
-        headers = {"Authorization": f"Token {api_token}"}
-        try:
-            r = requests.get(f"{base_url}database/rows/table/747/?user_field_names=true", headers=headers, timeout=10)
-            if r.status_code != 200:
-                self.status_label.text = f"Fehler beim Laden: {r.status_code}"
-                return
-            results = r.json().get("results", [])
-            heft_options = list({row.get("Heft/Noten") for row in results if row.get("Heft/Noten")})
-            komponist_options = list({row.get("Komponist") for row in results if row.get("Komponist")})
-            self.heft_input.all_options = heft_options
-            self.composer_input.all_options = komponist_options
-        except Exception as e:
-            self.status_label.text = f"Lade-Fehler: {e}"
+        dispatcher.cancel(self)
+        self._heft_options = set()
+        self._komponist_options = set()
+        self._perf = perf.begin("screen", "add_sheet_music")
+        dispatcher.submit(self, records.get, 747,
+                          on_success=self._on_options_loaded,
+                          on_error=self._on_options_error)
+
+    def _on_options_loaded(self, pieces):
+        self._add_options(pieces)
+        perf.end(self._perf, rows=len(pieces))
+
+    def _add_options(self, pieces):
+        """Neue Hefte/Komponisten (aus PieceRecords) lokal ergänzen, ohne Tabelle 747 neu zu lesen."""
+        pieces = list(pieces)
+        heft_count, komponist_count = len(self._heft_options), len(self._komponist_options)
+        self._heft_options.update(p.heft for p in pieces if p.heft)
+        self._komponist_options.update(p.komponist for p in pieces if p.komponist)
+        if len(self._heft_options) != heft_count:
+            self.heft_input.all_options = list(self._heft_options)
+        if len(self._komponist_options) != komponist_count:
+            self.composer_input.all_options = list(self._komponist_options)
+
+    def _on_options_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            self.status_label.text = f"Fehler beim Laden: {e.status_code}"
+            return
+        self.status_label.text = f"Lade-Fehler: {e}"
 
     def save_sheetmusic(self, instance):
         name = self.name_input.text.strip()
@@ -1003,41 +3768,152 @@ class AddSheetMusicScreen(Screen):
         if composer:
             payload["Komponist"] = composer
 
-        print("[DEBUG] Payload to send:", payload)
-
-        load_local_env()
-        base_url = os.getenv("BASEROW_URL")
-        api_token = os.getenv("API_TOKEN")
-        if not base_url or not api_token:
+        if not client.load_config():
             print("[ERROR] BASEROW_URL or API_TOKEN missing")
             return
-        headers = {"Authorization": f"Token {api_token}"}
 
-        try:
-            r = requests.post(f"{base_url}database/rows/table/747/?user_field_names=true",
-                              headers=headers, json=payload, timeout=10)
-            if r.status_code == 200:
-                print("[INFO] Notenstück erfolgreich hinzugefügt")
-                # Felder leeren
-                self.name_input.text = ""
-                self.heft_input.text_input.text = ""
-                self.page_input.text = ""
-                self.composer_input.text_input.text = ""
-                # Optionen aktualisieren
-                self.load_existing_options()
-                self.status_label.text = "Stück hinzugefügt ✅"
-            else:
-                print("[ERROR] Fehler beim Hinzufügen:", r.status_code, r.text)
-                self.status_label.text = f"Fehler: {r.status_code}"
-        except Exception as e:
-            print("[ERROR] Exception beim Hinzufügen:", e)
-            self.status_label.text = f"Fehler: {e}"
+        self.status_label.text = "Speichere …"
+        dispatcher.submit(None, outbox.send, "POST", 747, payload=payload,
+                          on_success=lambda result: self._on_sheetmusic_saved(result, payload),
+                          on_error=self._on_save_error)
+
+    def _on_sheetmusic_saved(self, result, payload):
+        outcome, detail = result
+        # Felder leeren
+        self.name_input.text = ""
+        self.heft_input.text_input.text = ""
+        self.page_input.text = ""
+        self.composer_input.text_input.text = ""
+        # Neues Heft/neuen Komponisten direkt in die Vorschläge übernehmen. Ohne Zeile
+        # (vorgemerkt, über das Journal gesendet oder schon vorhanden) zählt der Payload.
+        row = detail if outcome == "sent" and detail else {"id": 0, **payload}
+        self._add_options([PieceRecord(row)])
+        if outcome == "queued":
+            self.status_label.text = f"Offline – Stück vorgemerkt ({detail} ausstehend)"
+            return
+        print("[INFO] Notenstück erfolgreich hinzugefügt")
+        self.status_label.text = "Stück hinzugefügt ✅"
+
+    def _on_save_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            print("[ERROR] Fehler beim Hinzufügen:", e.status_code, e.text)
+            self.status_label.text = f"Fehler: {e.status_code}"
+            return
+        print("[ERROR] Exception beim Hinzufügen:", e)
+        self.status_label.text = f"Fehler: {e}"
+
+    def import_file(self, instance):
+        path = self.import_input.text.strip()
+        if not path or not os.path.isfile(path):
+            self.status_label.text = "Datei nicht gefunden"
+            return
+        if not client.load_config():
+            self.status_label.text = "BASEROW_URL oder API_TOKEN fehlt"
+            return
+        self._import_stats = {"created": 0, "skipped": 0, "invalid": 0}
+        self.status_label.text = "Importiere …"
+        # Schreibzugriff -> nicht an den Screen gebunden, läuft auch nach Verlassen weiter
+        dispatcher.submit_stream(None, import_sheetmusic, path,
+                                 on_item=self._on_import_progress,
+                                 on_done=self._on_import_done,
+                                 on_error=self._on_import_error)
+
+    def _on_import_progress(self, progress):
+        stats = self._import_stats
+        stats["created"] += len(progress["created"])
+        stats["skipped"], stats["invalid"] = progress["skipped"], progress["invalid"]
+        self._add_options(PieceRecord(r) for r in progress["created"])
+        self.status_label.text = f"{progress['read']} gelesen, {stats['created']} angelegt …"
+
+    def _on_import_done(self, batches):
+        stats = self._import_stats
+        msg = f"✅ {stats['created']} Stücke importiert, {stats['skipped']} bereits vorhanden"
+        if stats["invalid"]:
+            msg += f", {stats['invalid']} ohne Name/Heft"
+        print("[INFO] Notenimport:", msg)
+        self.status_label.text = msg
+
+    def _on_import_error(self, e):
+        if isinstance(e, BaserowAPIError):
+            print("[ERROR] Notenimport:", e.status_code, e.text)
+            self.status_label.text = f"Import abgebrochen: {e.status_code} ({self._import_stats['created']} angelegt)"
+            return
+        print("[ERROR] Notenimport:", e)
+        self.status_label.text = f"Import abgebrochen: {e}"
+
+    def on_leave(self):
+        dispatcher.cancel(self)
 
     def go_back(self, instance):
         self.manager.current = "main_menu"
 
 
 
+# ---------------------------------------------------
+# 🔹 Performance-HUD (Einstellung PERF_HUD=1)
+# ---------------------------------------------------
+class PerfHUD(Button):
+    """Halbtransparente Einblendung der letzten Messungen; Tippen exportiert das Log."""
+    INTERVAL = 1.0
+
+    def __init__(self, monitor, **kwargs):
+        super().__init__(size_hint=(None, None), size=(360, 110), font_size=12,
+                         halign="left", valign="top", background_normal="",
+                         background_color=(0, 0, 0, 0.6), **kwargs)
+        self.monitor = monitor
+        self.bind(size=lambda instance, value: setattr(instance, "text_size", value))
+        self.bind(on_release=lambda instance: self.monitor.export())
+
+    def attach(self):
+        Window.add_widget(self)
+        Window.bind(size=self._place)
+        self._place(Window, Window.size)
+        Clock.schedule_interval(self.refresh, self.INTERVAL)
+
+    def _place(self, window, size):
+        self.pos = (size[0] - self.width, size[1] - self.height)
+
+    def refresh(self, dt):
+        api = self.monitor.recent("api", n=20)
+        lines = []
+        if api:
+            avg = sum(s["ms"] for s in api) / len(api)
+            last = api[-1]
+            lines.append(f"API ⌀ {avg:.0f} ms, max {max(s['ms'] for s in api):.0f} ms (letzte {len(api)})")
+            lines.append(f"{last['name'][:40]} {last['ms']:.0f} ms {last.get('bytes', 0) // 1024} kB")
+        for s in self.monitor.recent("screen", n=2):
+            lines.append(f"Screen {s['name']}: {s['ms']:.0f} ms")
+        for s in self.monitor.recent("widgets", n=1):
+            lines.append(f"Widgets {s['name']}: {s['ms']:.0f} ms ({s.get('rows', 0)} Zeilen)")
+        self.text = "\n".join(lines) or "Noch keine Messungen"
+
+
+# ---------------------------------------------------
+# 🔹 Lazy Screens
+# ---------------------------------------------------
+# Diese Screens werden erst bei der ersten Navigation gebaut und laden ihre
+# Daten in on_pre_enter – vor dem Login passiert so kein einziger Tabellenzugriff.
+LAZY_SCREENS = {
+    "add_probe": AddProbeScreen,
+    "bulk_probe": BulkProbeScreen,
+    "edit_probe": EditProbeScreen,
+    "edit_selected_probe": EditSelectedProbeScreen,
+    "add_sheet_music": AddSheetMusicScreen,
+    "attendance_stats": AttendanceStatsScreen,
+    "piece_stats": PieceStatsScreen,
+}
+
+def get_or_create_screen(manager, name):
+    """Liefert den Screen und baut ihn beim ersten Zugriff."""
+    if name not in manager.screen_names:
+        manager.add_widget(LAZY_SCREENS[name](name=name))
+    return manager.get_screen(name)
+
+def show_screen(manager, name):
+    get_or_create_screen(manager, name)
+    manager.current = name
+
+
 # ---------------------------------------------------
 # 🔹 App
 # ---------------------------------------------------
@@ -1047,10 +3923,7 @@ class BaserowApp(App):
         sm = ScreenManager()
         sm.add_widget(LoginScreen(name="login"))
         sm.add_widget(MainMenu(name="main_menu"))
-        sm.add_widget(AddProbeScreen(name="add_probe"))
-        sm.add_widget(EditProbeScreen(name="edit_probe"))
-        sm.add_widget(EditSelectedProbeScreen(name="edit_selected_probe"))
-        sm.add_widget(AddSheetMusicScreen(name="add_sheet_music"))
+        # Alle weiteren Screens entstehen erst bei Bedarf (siehe LAZY_SCREENS)
 
         sm.current = "login"
         return sm
@@ -1058,14 +3931,30 @@ class BaserowApp(App):
     def on_start(self):
         print("[INFO] App gestartet – prüfe gespeicherte URL & Login …")
 
-        # Shortlink / BASEROW_URL holen
-        verify_or_refresh_baserow_url()
+        # Gespeicherte BASEROW_URL sofort verwenden; der Shortlink wird nur aufgelöst,
+        # wenn noch keine URL bekannt ist oder der Server nicht erreichbar ist (siehe BaserowClient)
+        client.load_config()
+        if client.base_url:
+            # Auto-Login verzögert starten, damit ScreenManager & Screens komplett gesetzt sind
+            Clock.schedule_once(self.attempt_login, 0.1)
+        else:
+            dispatcher.submit(None, verify_or_refresh_baserow_url,
+                              on_success=lambda url: self.attempt_login(0))
+
+        # Offline vorgemerkte Änderungen regelmäßig nachspielen
+        Clock.schedule_interval(self.sync_outbox, OUTBOX_SYNC_INTERVAL)
 
-        # Auto-Login verzögert starten, damit ScreenManager & Screens komplett gesetzt sind
-        Clock.schedule_once(self.attempt_login, 0.1)
+        # Optionale Performance-Anzeige für Messungen auf echten Geräten
+        if settings.get("PERF_HUD"):
+            PerfHUD(perf).attach()
 
     def attempt_login(self, dt):
-        if login_to_baserow():
+        dispatcher.submit(None, login_to_baserow, on_success=self._on_login_checked)
+
+    def _on_login_checked(self, ok):
+        if ok:
+            self.sync_outbox()
+            realtime.start()
             print("[OK] Login erfolgreich, Hauptmenü wird angezeigt")
             if self.root:
                 self.root.current = "main_menu"
@@ -1074,6 +3963,30 @@ class BaserowApp(App):
             if self.root:
                 self.root.current = "login"
 
+    def sync_outbox(self, dt=None):
+        """Spielt vorgemerkte Änderungen im Hintergrund nach."""
+        if not client.is_configured or outbox.pending_count == 0:
+            return
+        dispatcher.submit(None, outbox.flush, on_success=self._on_outbox_synced)
+
+    def _on_outbox_synced(self, result):
+        sent, dropped = result
+        if not sent and not dropped:
+            return
+        pending = outbox.pending_count
+        print(f"[INFO] Outbox: {sent} Änderungen synchronisiert, {dropped} verworfen, {pending} ausstehend")
+        screen = self.root.current_screen if self.root else None
+        if hasattr(screen, "status_label"):
+            text = f"Sync: {sent} übertragen, {pending} ausstehend"
+            screen.status_label.text = text + (f", {dropped} vom Server abgelehnt" if dropped else "")
+
+    def on_stop(self):
+        realtime.stop()
+        settings.flush()
+        if settings.get("PERF_HUD"):
+            perf.export()
+        dispatcher.shutdown()
+
 
 
 